@@ -5,10 +5,13 @@ Simplified integration with existing MongoDB setup
 """
 
 import asyncio
+import time
 import aiohttp
 import logging
-import json
+import orjson
+import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
 import os
 from pathlib import Path
@@ -29,11 +32,34 @@ class MonitoringZone:
         self.priority = priority
         self.country = country
 
+@lru_cache(maxsize=4096)
+def _parse_date(timestamp_str: str) -> datetime:
+    """
+    Parse a GFW date/timestamp string; cached because daily reports repeat a
+    handful of dates across every entry (failures raise and are not cached)
+    """
+    # Try ISO format first
+    if "T" in timestamp_str:
+        return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+    # Try date only format
+    elif len(timestamp_str) == 10:
+        return datetime.strptime(timestamp_str, "%Y-%m-%d")
+    else:
+        return datetime.fromisoformat(timestamp_str)
+
+# API entry fields already copied into position fields; raw_data only keeps the rest
+SAR_ENTRY_FIELDS = frozenset({
+    "date", "lat", "lon", "confidence", "vessel_length_m", "mmsi", "vesselType",
+    "shipName", "flag", "imo", "callsign", "is_fishing", "detections"
+})
+AIS_ENTRY_FIELDS = SAR_ENTRY_FIELDS - {"confidence", "detections"}
+
 class GlobalFishingWatchAPI:
     """Client for Global Fishing Watch APIs"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, store_raw: bool = False):
         self.api_key = api_key
+        self.store_raw = store_raw  # keep the complete API entry in raw_data
         self.base_url = "https://gateway.api.globalfishingwatch.org"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
@@ -42,70 +68,92 @@ class GlobalFishingWatchAPI:
         
         # Rate limiting
         self.requests_this_minute = 0
-        self.minute_start = datetime.now()
+        self.minute_start = time.monotonic()
         self.max_requests_per_minute = 60
-    
-    def _check_rate_limit(self):
-        """Simple rate limiting"""
-        import time
-        now = datetime.now()
-        if (now - self.minute_start).total_seconds() > 60:
-            self.requests_this_minute = 0
-            self.minute_start = now
-        
-        if self.requests_this_minute >= self.max_requests_per_minute:
-            sleep_time = 60 - (now - self.minute_start).total_seconds()
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, sleeping for {sleep_time:.1f} seconds")
-                time.sleep(sleep_time)
-                self.requests_this_minute = 0
-                self.minute_start = datetime.now()
-    
-    async def get_sar_detections_raw(self, zone: MonitoringZone, 
-                                   start_date: str, end_date: str) -> List[Dict]:
-        """Get raw SAR vessel detections from API using correct v3 format"""
-        self._check_rate_limit()
-        
-        # Use the correct v3 API format based on working test
-        url = f"{self.base_url}/v3/4wings/report"
         
-        # Query parameters (not JSON body)
-        params = {
+        # Request pieces that never change, built (and JSON-encoded) once
+        self.report_url = f"{self.base_url}/v3/4wings/report"
+        report_params = {
             "spatial-resolution": "HIGH",
-            "temporal-resolution": "DAILY", 
-            "datasets[0]": "public-global-sar-presence:latest",
-            "date-range": f"{start_date},{end_date}",
+            "temporal-resolution": "DAILY",
             "format": "JSON",
             "group-by": "VESSEL_ID"
         }
-        
-        # JSON body for region specification - use bbox format like in working test
-        bbox = zone.bbox
-        data = {
+        self._sar_params = {**report_params, "datasets[0]": "public-global-sar-presence:latest"}
+        self._ais_params = {**report_params, "datasets[0]": "public-ais-vessel-presence:latest"}
+        # JSON body for region specification (sent with the session's application/json header)
+        self._region_body = orjson.dumps({
             "region": {
                 "dataset": "public-eez-areas",
                 "id": 8465  # Use a specific EEZ area ID like in the working test
             }
-        }
+        })
+        
+        # Zone requests run concurrently; the lock makes the budget check atomic
+        self._rate_lock = asyncio.Lock()
+        
+        # One pooled session for every request, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session (connection pool + DNS cache) for all GFW requests"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _check_rate_limit(self):
+        """Simple rate limiting: reserve a request slot, waiting for the next minute if needed"""
+        async with self._rate_lock:
+            # Monotonic clock: cheap, and immune to wall-clock adjustments
+            now = time.monotonic()
+            if now - self.minute_start > 60:
+                self.requests_this_minute = 0
+                self.minute_start = now
+            
+            if self.requests_this_minute >= self.max_requests_per_minute:
+                sleep_time = 60 - (now - self.minute_start)
+                if sleep_time > 0:
+                    logger.info(f"Rate limit reached, sleeping for {sleep_time:.1f} seconds")
+                    await asyncio.sleep(sleep_time)
+                self.requests_this_minute = 0
+                self.minute_start = time.monotonic()
+            
+            self.requests_this_minute += 1
+    
+    async def get_sar_detections_raw(self, zone: MonitoringZone, 
+                                   start_date: str, end_date: str) -> List[Dict]:
+        """Get raw SAR vessel detections from API using correct v3 format"""
+        await self._check_rate_limit()
+        
+        # Constant parts are prebuilt in __init__; only the date range varies
+        url = self.report_url
+        params = {**self._sar_params, "date-range": f"{start_date},{end_date}"}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=self.headers, params=params, json=data) as response:
-                    self.requests_this_minute += 1
+            session = await self._get_session()
+            async with session.post(url, params=params, data=self._region_body) as response:
+                if response.status == 200:
+                    response_data = orjson.loads(await response.read())
+                    logger.info(f"SAR Response structure: {list(response_data.keys())}")
+                    if response_data.get("entries"):
+                        logger.info(f"First entry keys: {list(response_data['entries'][0].keys()) if response_data['entries'] else 'No entries'}")
+                    positions = self._parse_sar_positions(response_data, zone)
+                    logger.info(f"Retrieved {len(positions)} SAR positions for {zone.name}")
+                    return positions
+                else:
+                    error_text = await response.text()
+                    logger.error(f"SAR API error for {zone.name}: {response.status} - {error_text}")
+                    return []
                     
-                    if response.status == 200:
-                        response_data = await response.json()
-                        logger.info(f"SAR Response structure: {list(response_data.keys())}")
-                        if response_data.get("entries"):
-                            logger.info(f"First entry keys: {list(response_data['entries'][0].keys()) if response_data['entries'] else 'No entries'}")
-                        positions = self._parse_sar_positions(response_data, zone)
-                        logger.info(f"Retrieved {len(positions)} SAR positions for {zone.name}")
-                        return positions
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"SAR API error for {zone.name}: {response.status} - {error_text}")
-                        return []
-                        
         except Exception as e:
             logger.error(f"Error fetching SAR data for {zone.name}: {e}")
             return []
@@ -113,45 +161,25 @@ class GlobalFishingWatchAPI:
     async def get_ais_presence_raw(self, zone: MonitoringZone,
                                   start_date: str, end_date: str) -> List[Dict]:
         """Get raw AIS vessel presence from API using correct v3 format"""
-        self._check_rate_limit()
-        
-        # Use the correct v3 API format
-        url = f"{self.base_url}/v3/4wings/report"
-        
-        # Query parameters (not JSON body)
-        params = {
-            "spatial-resolution": "HIGH",
-            "temporal-resolution": "DAILY",
-            "datasets[0]": "public-ais-vessel-presence:latest", 
-            "date-range": f"{start_date},{end_date}",
-            "format": "JSON",
-            "group-by": "VESSEL_ID"
-        }
+        await self._check_rate_limit()
         
-        # JSON body for region specification - use bbox format like in working test
-        bbox = zone.bbox
-        data = {
-            "region": {
-                "dataset": "public-eez-areas",
-                "id": 8465  # Use a specific EEZ area ID like in the working test
-            }
-        }
+        # Constant parts are prebuilt in __init__; only the date range varies
+        url = self.report_url
+        params = {**self._ais_params, "date-range": f"{start_date},{end_date}"}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=self.headers, params=params, json=data) as response:
-                    self.requests_this_minute += 1
+            session = await self._get_session()
+            async with session.post(url, params=params, data=self._region_body) as response:
+                if response.status == 200:
+                    response_data = orjson.loads(await response.read())
+                    positions = self._parse_ais_positions(response_data, zone)
+                    logger.info(f"Retrieved {len(positions)} AIS positions for {zone.name}")
+                    return positions
+                else:
+                    error_text = await response.text()
+                    logger.error(f"AIS API error for {zone.name}: {response.status} - {error_text}")
+                    return []
                     
-                    if response.status == 200:
-                        response_data = await response.json()
-                        positions = self._parse_ais_positions(response_data, zone)
-                        logger.info(f"Retrieved {len(positions)} AIS positions for {zone.name}")
-                        return positions
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"AIS API error for {zone.name}: {response.status} - {error_text}")
-                        return []
-                        
         except Exception as e:
             logger.error(f"Error fetching AIS data for {zone.name}: {e}")
             return []
@@ -159,16 +187,16 @@ class GlobalFishingWatchAPI:
     def _parse_sar_positions(self, data: Dict, zone: MonitoringZone) -> List[Dict]:
         """Parse SAR detection API response into position dictionaries"""
         positions = []
+        bad_entries = 0
         
         # The new API response structure has entries with dataset-specific data
         for entry in data.get("entries", []):
             try:
-                logger.info(f"Processing entry: {entry}")
                 # Each entry contains dataset-specific data
                 for dataset_name, dataset_entries in entry.items():
-                    logger.info(f"Found dataset: {dataset_name}, entries type: {type(dataset_entries)}")
                     if "sar-presence" in dataset_name.lower() or "public-global-sar-presence" in dataset_name:
-                        logger.info(f"Processing SAR dataset: {dataset_name} with {len(dataset_entries) if dataset_entries else 0} entries")
+                        logger.debug("Processing SAR dataset: %s with %d entries",
+                                     dataset_name, len(dataset_entries) if dataset_entries else 0)
                         if dataset_entries:  # Check if dataset_entries is not None
                             for sar_entry in dataset_entries:
                                 # Generate unique ID for SAR detection
@@ -195,27 +223,42 @@ class GlobalFishingWatchAPI:
                                     "ais_matched": bool(sar_entry.get("mmsi")),  # Has MMSI = AIS matched
                                     "is_fishing": sar_entry.get("is_fishing", False),
                                     "detections": sar_entry.get("detections", 1),
-                                    "raw_data": sar_entry
+                                    "raw_data": self._raw_data(sar_entry, SAR_ENTRY_FIELDS)
                                 }
                                 positions.append(position)
                 
             except Exception as e:
-                logger.warning(f"Error parsing SAR position: {e}")
+                # Counted and reported once below instead of logging every bad entry
+                bad_entries += 1
+                last_error = e
                 continue
         
-        return positions
+        if bad_entries:
+            logger.warning("Skipped %d malformed SAR entries (last error: %s)", bad_entries, last_error)
+        
+        return self._drop_invalid_coordinates(positions)
+    
+    def _drop_invalid_coordinates(self, positions: List[Dict]) -> List[Dict]:
+        """Drop positions whose lat/lon are out of range, checked as one array pass"""
+        n = len(positions)
+        lats = np.fromiter((p["lat"] for p in positions), dtype=np.float64, count=n)
+        lons = np.fromiter((p["lon"] for p in positions), dtype=np.float64, count=n)
+        valid = (lats >= -90) & (lats <= 90) & (lons >= -180) & (lons <= 180)
+        if valid.all():
+            return positions
+        logger.warning(f"Dropping {n - int(valid.sum())} positions with invalid coordinates")
+        return [positions[i] for i in np.flatnonzero(valid)]
+    
+    def _raw_data(self, entry: Dict, flattened: frozenset) -> Optional[Dict]:
+        """Complete entry if store_raw, otherwise only the fields not already flattened"""
+        if self.store_raw:
+            return entry
+        return {k: v for k, v in entry.items() if k not in flattened} or None
     
     def _parse_timestamp(self, timestamp_str: str) -> datetime:
         """Parse timestamp string to datetime object"""
         try:
-            # Try ISO format first
-            if "T" in timestamp_str:
-                return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            # Try date only format
-            elif len(timestamp_str) == 10:
-                return datetime.strptime(timestamp_str, "%Y-%m-%d")
-            else:
-                return datetime.fromisoformat(timestamp_str)
+            return _parse_date(timestamp_str)
         except:
             # Fallback to current time
             return datetime.utcnow()
@@ -223,6 +266,7 @@ class GlobalFishingWatchAPI:
     def _parse_ais_positions(self, data: Dict, zone: MonitoringZone) -> List[Dict]:
         """Parse AIS presence API response into position dictionaries"""
         positions = []
+        bad_entries = 0
         
         # The new API response structure has entries with dataset-specific data
         for entry in data.get("entries", []):
@@ -253,15 +297,19 @@ class GlobalFishingWatchAPI:
                                 "callsign": ais_entry.get("callsign", ""),
                                 "ais_matched": True,  # AIS is by definition matched
                                 "is_fishing": ais_entry.get("is_fishing", False),
-                                "raw_data": ais_entry
+                                "raw_data": self._raw_data(ais_entry, AIS_ENTRY_FIELDS)
                             }
                             positions.append(position)
                 
             except Exception as e:
-                logger.warning(f"Error parsing AIS position: {e}")
+                bad_entries += 1
+                last_error = e
                 continue
         
-        return positions
+        if bad_entries:
+            logger.warning("Skipped %d malformed AIS entries (last error: %s)", bad_entries, last_error)
+        
+        return self._drop_invalid_coordinates(positions)
 
 class AISDataCollector:
     """Main AIS data collection orchestrator"""
@@ -270,6 +318,10 @@ class AISDataCollector:
         self.api = GlobalFishingWatchAPI(api_key)
         self.zones = self._get_default_zones()
     
+    async def close(self):
+        """Release the API client's HTTP session"""
+        await self.api.close()
+    
     def _get_default_zones(self) -> List[MonitoringZone]:
         """Get default North American monitoring zones"""
         return [
@@ -338,15 +390,16 @@ class AISDataCollector:
             # Get SAR vessel detections (includes AIS matching status)
             sar_positions = await self.api.get_sar_detections_raw(zone, start_str, end_str)
             if sar_positions:
-                mongodb.store_vessel_positions_bulk(sar_positions)
+                await asyncio.to_thread(mongodb.store_vessel_positions_bulk, sar_positions)
                 results["sar_positions"] = len(sar_positions)
-                results["sar_matched"] = len([p for p in sar_positions if p.get("ais_matched", False)])
-                results["sar_unmatched"] = len([p for p in sar_positions if not p.get("ais_matched", False)])
+                # One counting pass; unmatched is the remainder
+                results["sar_matched"] = sum(1 for p in sar_positions if p.get("ais_matched", False))
+                results["sar_unmatched"] = len(sar_positions) - results["sar_matched"]
             
             # Get AIS vessel presence
             ais_positions = await self.api.get_ais_presence_raw(zone, start_str, end_str)
             if ais_positions:
-                mongodb.store_vessel_positions_bulk(ais_positions)
+                await asyncio.to_thread(mongodb.store_vessel_positions_bulk, ais_positions)
                 results["ais_positions"] = len(ais_positions)
             
             logger.info(f"Zone {zone.name} - SAR: {results['sar_positions']} "
@@ -372,23 +425,23 @@ class AISDataCollector:
             "zone_details": {}
         }
         
-        # Process each zone
-        for zone in self.zones:
-            try:
-                zone_results = await self.collect_zone_data(zone, days_back)
-                
-                total_results["zones_processed"] += 1
-                total_results["total_sar_positions"] += zone_results["sar_positions"]
-                total_results["total_ais_positions"] += zone_results["ais_positions"]
-                total_results["total_sar_matched"] += zone_results["sar_matched"]
-                total_results["total_sar_unmatched"] += zone_results["sar_unmatched"]
-                total_results["zone_details"][zone.name] = zone_results
-                
-                # Small delay between zones to be respectful to API
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Failed to process zone {zone.name}: {e}")
+        # Collect every zone concurrently; _check_rate_limit keeps requests within the API budget
+        zone_results_list = await asyncio.gather(
+            *(self.collect_zone_data(zone, days_back) for zone in self.zones),
+            return_exceptions=True
+        )
+        
+        for zone, zone_results in zip(self.zones, zone_results_list):
+            if isinstance(zone_results, Exception):
+                logger.error(f"Failed to process zone {zone.name}: {zone_results}")
+                continue
+            
+            total_results["zones_processed"] += 1
+            total_results["total_sar_positions"] += zone_results["sar_positions"]
+            total_results["total_ais_positions"] += zone_results["ais_positions"]
+            total_results["total_sar_matched"] += zone_results["sar_matched"]
+            total_results["total_sar_unmatched"] += zone_results["sar_unmatched"]
+            total_results["zone_details"][zone.name] = zone_results
         
         duration = datetime.now() - start_time
         total_results["collection_duration_seconds"] = duration.total_seconds()
@@ -405,7 +458,10 @@ class AISDataCollector:
 async def collect_ais_data(api_key: str, days_back: int = 7):
     """Collect AIS data and store in MongoDB"""
     collector = AISDataCollector(api_key)
-    results = await collector.collect_all_zones(days_back)
+    try:
+        results = await collector.collect_all_zones(days_back)
+    finally:
+        await collector.close()
     return results
 
 if __name__ == "__main__":
@@ -9,9 +9,9 @@ from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 
 # Data Models for AIS Integration
-@dataclass
+@dataclass(slots=True)
 class VesselPosition:
-    """Raw vessel position data from SAR or AIS"""
+    """Raw vessel position data from SAR or AIS (slotted: no per-instance __dict__)"""
     id: str
     source: str  # 'SAR' or 'AIS'
     lat: float
@@ -44,6 +44,10 @@ class VesselPosition:
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.utcnow()
+    
+    def to_document(self) -> Dict[str, Any]:
+        """Shallow field dict for MongoDB (raw_data is referenced, not copied)"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 @dataclass
 class MonitoringZone:
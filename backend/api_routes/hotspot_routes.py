@@ -9,7 +9,7 @@ import logging
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from services.enhanced_hotspot_service import enhanced_hotspot_detector
-from services.hotspot_service import hotspot_service
+from services.hotspot_service import get_hotspot_service
 from .mongodb import getVesselDataForHotspotAnalysis, getAISSummary
 
 # Set up logging
@@ -57,6 +57,7 @@ async def get_all_hotspots(
 ):
     """Get all hotspots with optional filtering."""
     try:
+        hotspot_service = get_hotspot_service()
         hotspots = hotspot_service.hotspots
         
         # Apply filters
@@ -92,6 +93,7 @@ async def get_top_hotspots(
 ):
     """Get top N hotspots by risk score."""
     try:
+        hotspot_service = get_hotspot_service()
         hotspots = hotspot_service.get_top_hotspots(limit=limit, min_risk=min_risk)
         
         # Add ranking information
@@ -121,6 +123,7 @@ async def get_hotspots_by_region(
 ):
     """Get hotspots within a geographic region."""
     try:
+        hotspot_service = get_hotspot_service()
         hotspots = hotspot_service.get_hotspots_by_region(min_lat, max_lat, min_lon, max_lon)
         
         return {
@@ -142,6 +145,7 @@ async def get_hotspots_by_region(
 async def get_hotspots_by_month(month: int):
     """Get hotspots for a specific month."""
     try:
+        hotspot_service = get_hotspot_service()
         if month < 1 or month > 12:
             raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
         
@@ -163,6 +167,7 @@ async def get_hotspots_by_month(month: int):
 async def get_hotspot_statistics():
     """Get comprehensive hotspot statistics."""
     try:
+        hotspot_service = get_hotspot_service()
         stats = hotspot_service.get_statistics()
         
         # Add monthly breakdown
@@ -188,6 +193,7 @@ async def get_hotspot_statistics():
 async def get_globe_integration_data():
     """Get data specifically formatted for Three.js globe integration."""
     try:
+        hotspot_service = get_hotspot_service()
         # Get top 5 hotspots
         top_hotspots = hotspot_service.get_top_hotspots(limit=5)
         
@@ -273,6 +279,7 @@ async def get_risk_levels():
 async def refresh_hotspot_data():
     """Refresh hotspot data from files."""
     try:
+        hotspot_service = get_hotspot_service()
         hotspot_service.load_data()
         
         return {
@@ -407,6 +414,7 @@ async def get_ais_data_summary():
 async def get_enhanced_hotspot_statistics():
     """Get enhanced statistics combining file-based and MongoDB data."""
     try:
+        hotspot_service = get_hotspot_service()
         # Get file-based statistics
         file_stats = hotspot_service.get_statistics()
         
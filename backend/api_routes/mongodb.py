@@ -1,6 +1,11 @@
 from pymongo.mongo_client import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from pymongo import UpdateOne
 import os
+import threading
+import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import dotenv
@@ -21,8 +26,26 @@ AIS data collections for Global Fishing Watch integration:
 """
 
 uri = os.getenv("mongouri")
-client = MongoClient(uri)
-db = client["pennapps"]
+
+# One pooled client for the whole process; every handler reuses these sockets
+# instead of paying connect/TLS/auth per request.
+client = MongoClient(
+    uri,
+    maxPoolSize=100,
+    minPoolSize=10,
+    maxIdleTimeMS=300000,
+    retryWrites=True,
+)
+db = client.get_database("pennapps")
+
+def get_db():
+    """Shared database handle backed by the pooled client"""
+    return db
+
+# Async client for writes issued from inside request handlers
+motor_client = AsyncIOMotorClient(uri)
+motor_db = motor_client["pennapps"]
+pos_data_async = motor_db["position_data"]
 
 # Existing collections
 prompt_logs = db["prompt_logs"]
@@ -34,8 +57,59 @@ vessel_positions = db["vessel_positions"]
 monitoring_zones = db["monitoring_zones"]
 ais_metadata = db["ais_metadata"]
 
-def logPos(lat, lon, matched, vessel):
-    pos_data.insert_one({
+# Set once vessel_positions and its indexes have been ensured in this process;
+# the lock keeps concurrent collector writers from racing the setup
+_vessel_positions_ready = False
+_vessel_positions_lock = threading.Lock()
+
+def ensureCollections():
+    """Create vessel_positions with zstd block compression if it doesn't exist yet"""
+    # Position documents repeat the same keys and string values, which WiredTiger
+    # zstd compresses far better than the default snappy; an existing
+    # collection keeps whatever compressor it was created with
+    if 'vessel_positions' not in db.list_collection_names(filter={'name': 'vessel_positions'}):
+        try:
+            db.create_collection(
+                'vessel_positions',
+                storageEngine={'wiredTiger': {'configString': 'block_compressor=zstd'}}
+            )
+        except CollectionInvalid:
+            pass  # created by another process since the check
+        except OperationFailure as e:
+            if e.code != 48:  # NamespaceExists
+                raise
+
+def ensureIndexes():
+    """Create the indexes the analysis queries rely on (no-op if they already exist)"""
+    vessel_positions.create_index([('timestamp', 1)])
+    # getUnmatchedSAR: equality on source, then ais_matched, then newest-first timestamps
+    vessel_positions.create_index(
+        [('source', 1), ('ais_matched', 1), ('timestamp', -1)], name='sar_unmatched_recent'
+    )
+    # Position ids are deterministic, so re-collected detections are rejected as duplicates
+    vessel_positions.create_index(
+        [('id', 1)], unique=True, partialFilterExpression={'id': {'$type': 'string'}}
+    )
+
+def ensureVesselPositionsReady():
+    """Ensure vessel_positions (zstd) and its indexes once per process, for writers outside the API server"""
+    global _vessel_positions_ready
+    if _vessel_positions_ready:
+        return
+    with _vessel_positions_lock:
+        if _vessel_positions_ready:
+            return
+        ensureCollections()
+        try:
+            ensureIndexes()
+        except OperationFailure as e:
+            # e.g. existing duplicate ids block the unique index; writes still go
+            # through, re-collected detections are just not deduplicated
+            print(f"Could not create vessel_positions indexes: {e}")
+        _vessel_positions_ready = True
+
+def positionDoc(lat, lon, matched, vessel):
+    return {
         "date": vessel["date"],
         "latitude": lat,
         "longitude": lon,
@@ -45,7 +119,15 @@ def logPos(lat, lon, matched, vessel):
         "flag": vessel["flag"],
         "shipName": vessel["shipName"],
         "geartype": vessel["geartype"],
-    })
+    }
+
+def logPos(lat, lon, matched, vessel):
+    pos_data.insert_one(positionDoc(lat, lon, matched, vessel))
+
+def logPosBulk(docs):
+    """Insert a batch of position docs (built with positionDoc) in one round trip"""
+    if docs:
+        pos_data.insert_many(docs, ordered=False)
 
 def logPrompt(user, prompt, answer):
     prompt_logs.insert_one({
@@ -54,6 +136,13 @@ def logPrompt(user, prompt, answer):
         "answer": answer,
     })
 
+async def logPromptAsync(user, prompt, answer):
+    await motor_db["prompt_logs"].insert_one({
+        "user": user,
+        "prompt": prompt,
+        "answer": answer,
+    })
+
 def logReport(user, report):
     report_logs.insert_one({
         "user": user,
@@ -63,8 +152,13 @@ def logReport(user, report):
 def getPos():
     return list(pos_data.find())
 
+def streamPos():
+    """Async cursor over position data, for streaming responses"""
+    return pos_data_async.find()
+
 def closedb():
     client.close()
+    motor_client.close()
 
 # AIS Data Functions
 def logAISPosition(position_data: dict):
@@ -84,7 +178,79 @@ def logAISPosition(position_data: dict):
         print(f"Error logging AIS position: {e}")
         raise e
 
-def getAISPositions(source: str = None, zone_name: str = None, hours_back: int = 24):
+def logAISPositionBatch(positions: List[dict], batch_size: int = 500) -> int:
+    """Log many AIS position dicts to MongoDB with one insert_many per batch"""
+    try:
+        inserted = 0
+        now = datetime.utcnow()
+        for start in range(0, len(positions), batch_size):
+            batch = positions[start:start + batch_size]
+            for position_data in batch:
+                # Add timestamp if not present, and created_at
+                position_data.setdefault('timestamp', now)
+                position_data['created_at'] = now
+            
+            result = vessel_positions.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        return inserted
+    except Exception as e:
+        print(f"Error logging AIS positions: {e}")
+        raise e
+
+def store_vessel_positions_bulk(positions: List[Any], batch_size: int = 1000) -> int:
+    """
+    Store position dicts (or ais_models.VesselPosition objects) in batches:
+    bulk insert, then upsert by id only the ones already stored
+    """
+    # Duplicate ids are only rejected (and upserted below) if the unique id index exists
+    ensureVesselPositionsReady()
+    
+    stored = 0
+    created_at = datetime.utcnow()
+    for start in range(0, len(positions), batch_size):
+        # Shallow copy of each position's fields (raw_data is referenced, not
+        # deep-copied like dataclasses.asdict would); None fields are left out
+        batch = [
+            {k: v for k, v in (position if isinstance(position, dict) else position.to_document()).items()
+             if v is not None}
+            for position in positions[start:start + batch_size]
+        ]
+        for position in batch:
+            position.setdefault('created_at', created_at)
+        
+        try:
+            stored += len(vessel_positions.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            stored += e.details.get('nInserted', 0)
+            write_errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != 11000 for error in write_errors):
+                print(f"Error storing vessel positions: {e}")
+                raise e
+            
+            # Duplicate ids: refresh the stored copy instead
+            updates = []
+            for error in write_errors:
+                position = batch[error['index']]
+                fields = {k: v for k, v in position.items() if k not in ('_id', 'created_at')}
+                updates.append(UpdateOne(
+                    {'id': position['id']},
+                    {'$set': fields, '$setOnInsert': {'created_at': position['created_at']}},
+                    upsert=True
+                ))
+            vessel_positions.bulk_write(updates, ordered=False)
+            stored += len(updates)
+    
+    return stored
+
+def bboxQuery(bbox) -> dict:
+    """lat/lon range filter for a [min_lon, min_lat, max_lon, max_lat] box (MonitoringZone order)"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return {
+        'lat': {'$gte': min_lat, '$lte': max_lat},
+        'lon': {'$gte': min_lon, '$lte': max_lon}
+    }
+
+def getAISPositions(source: str = None, zone_name: str = None, hours_back: int = 24, bbox=None):
     """Get AIS positions with optional filtering"""
     try:
         # Build query
@@ -102,6 +268,10 @@ def getAISPositions(source: str = None, zone_name: str = None, hours_back: int =
         if zone_name:
             query['zone_name'] = zone_name
         
+        # Bounding box prefilter, applied by the server before any finer geometry check
+        if bbox:
+            query.update(bboxQuery(bbox))
+        
         # Execute query
         positions = list(vessel_positions.find(query).sort('timestamp', -1))
         
@@ -110,7 +280,7 @@ def getAISPositions(source: str = None, zone_name: str = None, hours_back: int =
         print(f"Error getting AIS positions: {e}")
         raise e
 
-def getUnmatchedSAR(zone_name: str = None, hours_back: int = 24):
+def getUnmatchedSAR(zone_name: str = None, hours_back: int = 24, bbox=None):
     """Get SAR positions that didn't match with AIS"""
     try:
         # Build query for unmatched SAR positions
@@ -127,6 +297,10 @@ def getUnmatchedSAR(zone_name: str = None, hours_back: int = 24):
         if zone_name:
             query['zone_name'] = zone_name
         
+        # Bounding box prefilter
+        if bbox:
+            query.update(bboxQuery(bbox))
+        
         # Execute query
         positions = list(vessel_positions.find(query).sort('timestamp', -1))
         
@@ -235,3 +409,104 @@ def getVesselDataForHotspotAnalysis(start_date: datetime = None, end_date: datet
         raise e
 
 
+
+def getVesselColumnsForHotspotAnalysis(start_date: datetime = None, end_date: datetime = None):
+    """Get vessel coordinates for hotspot analysis as column arrays (lat/lon per group)"""
+    try:
+        # Default to last 30 days if no dates provided
+        if not start_date:
+            start_date = datetime.utcnow() - timedelta(days=30)
+        if not end_date:
+            end_date = datetime.utcnow()
+        
+        query = {
+            'timestamp': {
+                '$gte': start_date.isoformat(),
+                '$lte': end_date.isoformat()
+            }
+        }
+        # Only the fields clustering needs; skip ids, names and raw payloads
+        projection = {'_id': 0, 'lat': 1, 'lon': 1, 'source': 1, 'ais_matched': 1}
+        
+        positions = list(vessel_positions.find(query, projection))
+        n = len(positions)
+        
+        lat = np.fromiter((pos.get('lat', 0) for pos in positions), dtype=np.float64, count=n)
+        lon = np.fromiter((pos.get('lon', 0) for pos in positions), dtype=np.float64, count=n)
+        tracked = np.fromiter(
+            (pos.get('source') == 'AIS' or pos.get('ais_matched') == True for pos in positions),
+            dtype=bool, count=n
+        )
+        
+        return {
+            'tracked': {'lat': lat[tracked], 'lon': lon[tracked]},
+            'untracked': {'lat': lat[~tracked], 'lon': lon[~tracked]},
+            'total_vessels': n,
+            'date_range': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat()
+            }
+        }
+    except Exception as e:
+        print(f"Error getting vessel columns for hotspot analysis: {e}")
+        raise e
+
+def getVesselMonthColumnsForHotspotAnalysis(start_date: datetime = None, end_date: datetime = None):
+    """Get vessel coordinates, month and tracked flag as column arrays, derived server-side"""
+    try:
+        # Default to last 30 days if no dates provided
+        if not start_date:
+            start_date = datetime.utcnow() - timedelta(days=30)
+        if not end_date:
+            end_date = datetime.utcnow()
+        
+        pipeline = [
+            {'$match': {
+                'timestamp': {
+                    '$gte': start_date.isoformat(),
+                    '$lte': end_date.isoformat()
+                }
+            }},
+            # Month and tracked status are computed by the server so only four
+            # scalars per vessel cross the wire; 0 marks a missing/unparseable timestamp
+            {'$project': {
+                '_id': 0,
+                'lat': {'$ifNull': ['$lat', 0]},
+                'lon': {'$ifNull': ['$lon', 0]},
+                'month': {'$switch': {
+                    'branches': [
+                        {'case': {'$eq': [{'$type': '$timestamp'}, 'date']},
+                         'then': {'$month': '$timestamp'}},
+                        # ISO strings: YYYY-MM-DD...
+                        {'case': {'$eq': [{'$type': '$timestamp'}, 'string']},
+                         'then': {'$convert': {
+                             'input': {'$substrBytes': ['$timestamp', 5, 2]},
+                             'to': 'int', 'onError': 0, 'onNull': 0
+                         }}}
+                    ],
+                    'default': 0
+                }},
+                'tracked': {'$or': [
+                    {'$eq': ['$source', 'AIS']},
+                    {'$eq': ['$ais_matched', True]}
+                ]}
+            }}
+        ]
+        
+        positions = list(vessel_positions.aggregate(pipeline))
+        n = len(positions)
+        
+        return {
+            'lat': np.fromiter((pos['lat'] for pos in positions), dtype=np.float32, count=n),
+            'lon': np.fromiter((pos['lon'] for pos in positions), dtype=np.float32, count=n),
+            'month': np.fromiter((pos['month'] for pos in positions), dtype=np.int8, count=n),
+            'tracked': np.fromiter((pos['tracked'] for pos in positions), dtype=bool, count=n),
+            'total_vessels': n,
+            'date_range': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat()
+            }
+        }
+    except Exception as e:
+        print(f"Error getting vessel month columns for hotspot analysis: {e}")
+        raise e
@@ -1,16 +1,20 @@
 from fastapi import FastAPI, HTTPException, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import json
+import asyncio
 from contextlib import asynccontextmanager
 import uvicorn
 import dotenv
 import os
 import google.generativeai as genai
-from exa_py import Exa
+import httpx
 from cleanjson import convertJSON
 import random
+import orjson
+import numpy as np
 
 dotenv.load_dotenv()
 
@@ -18,12 +22,28 @@ dotenv.load_dotenv()
 # If mongodb is in the project root, just `import mongodb`
 from api_routes import mongodb
 
+# Background prompt-log writes; keep references so tasks aren't GC'd mid-flight
+_background_tasks = set()
+
+def _report_background_failure(task: asyncio.Task):
+    """Surface errors from fire-and-forget log writes instead of dropping them"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error logging prompt: {task.exception()}")
+
+def log_prompt_background(user_id: str, prompt: str, answer: str):
+    """Schedule the prompt log insert without making the response wait on it"""
+    task = asyncio.create_task(mongodb.logPromptAsync(user_id, prompt, answer))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(_report_background_failure)
+
 # Configure Gemini
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 model = genai.GenerativeModel("gemini-2.5-flash-lite")
 
-# Configure Exa
-exa = Exa(api_key=os.getenv("EXA_API_KEY"))
+# Configure Exa (called over the shared HTTP client, see lifespan)
+EXA_API_KEY = os.getenv("EXA_API_KEY")
+EXA_SEARCH_URL = "https://api.exa.ai/search"
 
 # Pydantic Models (moved from ai_routes.py)
 class ChatRequest(BaseModel):
@@ -68,6 +88,24 @@ class ReportGenerateRequest(BaseModel):
     sections: ReportSections
     title: Optional[str] = ""
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: one pooled HTTP/2 client shared by outbound API calls
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=50),
+    )
+    try:
+        mongodb.ensureVesselPositionsReady()
+    except Exception as e:
+        print(f"Could not ensure MongoDB indexes: {e}")
+
+    yield
+
+    # Shutdown: close pooled connections
+    await app.state.http.aclose()
+
 # @asynccontextmanager
 # async def lifespan(app: FastAPI):
 #     # Startup: Collect AIS data from GFW API
@@ -93,7 +131,8 @@ app = FastAPI(
     title="PennApps Backend API",
     description="Backend API for PennApps hackathon project with AI integrations",
     version="1.0.0",
-    # lifespan=lifespan
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 origins = [
@@ -138,7 +177,7 @@ async def health_check():
             gemini_status = "error"
         
         # Test Exa connection (simple check)
-        exa_status = "ok" if os.getenv("EXA_API_KEY") else "no_api_key"
+        exa_status = "ok" if EXA_API_KEY else "no_api_key"
         
         return {
             "status": "healthy",
@@ -167,7 +206,7 @@ async def gemini_chat(request: ChatRequest):
         ai_response = "I couldn't generate a response. Please try again."
     
     # Log the conversation
-    mongodb.logPrompt(request.user_id, request.prompt, ai_response)
+    log_prompt_background(request.user_id, request.prompt, ai_response)
     
     return convertJSON(ai_response)
     
@@ -183,26 +222,31 @@ async def exa_search(request: SearchRequest):
     try:
         search_params = {
             "query": request.query,
-            "num_results": request.num_results,
+            "numResults": request.num_results,
             "type": "neural",
-            "use_autoprompt": True,
+            "useAutoprompt": True,
         }
         
         if request.include_domains:
-            search_params["include_domains"] = request.include_domains
+            search_params["includeDomains"] = request.include_domains
         
         if request.exclude_domains:
-            search_params["exclude_domains"] = request.exclude_domains
+            search_params["excludeDomains"] = request.exclude_domains
         
-        results = exa.search(**search_params)
+        response = await app.state.http.post(
+            EXA_SEARCH_URL,
+            json=search_params,
+            headers={"x-api-key": EXA_API_KEY},
+        )
+        response.raise_for_status()
         
         formatted_results = []
-        for result in results.results:
+        for result in response.json().get("results", []):
             formatted_results.append({
-                "title": result.title,
-                "url": result.url,
-                "score": result.score,
-                "published_date": result.published_date
+                "title": result.get("title"),
+                "url": result.get("url"),
+                "score": result.get("score"),
+                "published_date": result.get("publishedDate")
             })
         
         return {
@@ -214,14 +258,88 @@ async def exa_search(request: SearchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in exa search: {str(e)}")
 
+# Report prompt fragments; only the per-request pieces are joined in the handler
+_CLEARANCE_INSTRUCTIONS = {
+    "Public Trust": (
+        "Adopt an accessible, non-sensitive tone suitable for public release. Avoid operationally sensitive details."
+    ),
+    "Confidential": (
+        "Use professional language and include nuanced risk qualifiers. Avoid exact coordinates or personally identifiable information."
+    ),
+    "Top Secret": (
+        "Use precise, analytical tone with crisp recommendations. Do not expose classified sources; summarize methods abstractly."
+    ),
+}
+_DEFAULT_CLEARANCE_INSTRUCTION = "Use a professional tone appropriate to the audience."
+
+# Strict JSON schema so the frontend can render charts with Recharts
+_REPORT_SCHEMA_BLOCK = (
+    "\n"  # leading newline for readability
+    "{\n"
+    "  \"executiveSummary\": [\"string paragraph\", \"string paragraph\"],\n"
+    "  \"sections\": [\n"
+    "    {\n"
+    "      \"heading\": \"string\",\n"
+    "      \"content\": [\"string paragraph\"],\n"
+    "      \"chart\": {\n"
+    "        \"type\": \"bar|radial|pie|none\",\n"
+    "        \"callout\": \"string one-sentence chart note\"\n"
+    "      }\n"
+    "    }\n"
+    "  ]\n"
+    "}\n"
+)
+
+_REPORT_ROLE = (
+    ". You are an intelligence analyst assisting a maritime monitoring team working on IUU (Illegal, Unreported, and Unregulated) fishing detection and response. Generate a polished, decision-ready report for the PennApps operational console.\n\n"
+)
+
+_REPORT_FORMAT_RULES = (
+    "Return STRICT JSON ONLY (no markdown, no code fences, no prose outside JSON) that conforms to this schema:" + _REPORT_SCHEMA_BLOCK + "\n"
+    "Rules:\n"
+    "- Include ONLY the requested sections and in a logical order.\n"
+    "- Use careful qualitative language; do not invent precise numbers.\n"
+    "- Keep paragraphs short (2–5 sentences). Avoid lists inside paragraphs.\n"
+)
+
+def _extract_json_obj(s: str) -> Optional[str]:
+    """Return the first balanced {...} object in s, ignoring braces inside strings"""
+    start = s.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        c = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
 class Message(BaseModel):
     prompt: str
 
-def serialize_doc(doc : dict):
-    """Helper function to serialize MongoDB documents"""
+POSITIONS_BATCH_SIZE = 1000
+
+def serialize_doc(doc : dict, dlat: float, dlng: float):
+    """Helper function to serialize MongoDB documents, applying a precomputed position jitter"""
     doc["_id"] = str(doc["_id"])
-    doc["lat"] = doc.pop("latitude") + random.random() * 0.001
-    doc["lng"] = doc.pop("longitude") + random.random() * 0.001
+    doc["lat"] = doc.pop("latitude") + dlat
+    doc["lng"] = doc.pop("longitude") + dlng
     doc["registered"] = doc.pop("matched")
     doc["timestamp"] = doc.pop("date")
     return doc
@@ -235,15 +353,38 @@ async def root():
         "health": "/api/ai/health"
     }
 
-@app.get("/api/getPositions")
+@app.get("/api/getPositions", response_model=None)
 async def get_positions():
     """
     Get all position data from the database
     """
-    random.seed(4)
-    docs = mongodb.getPos()
-    docs = [serialize_doc(x) for x in docs]
-    return docs
+    # Fetch the first batch before the response starts, so connection and
+    # query errors still become a 500 instead of a truncated 200 body
+    cursor = mongodb.streamPos()
+    try:
+        first_batch = await cursor.to_list(length=POSITIONS_BATCH_SIZE)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching positions: {str(e)}")
+    
+    async def stream_positions():
+        # Stream a JSON array straight off the cursor instead of buffering every doc;
+        # jitter is drawn per batch from one seeded generator
+        rng = np.random.default_rng(4)
+        yield b"["
+        batch = first_batch
+        first = True
+        while batch:
+            jitter = rng.uniform(0, 0.001, (len(batch), 2))
+            chunk = b",".join(
+                orjson.dumps(serialize_doc(doc, float(dlat), float(dlng)))
+                for doc, (dlat, dlng) in zip(batch, jitter)
+            )
+            yield chunk if first else b"," + chunk
+            first = False
+            batch = await cursor.to_list(length=POSITIONS_BATCH_SIZE)
+        yield b"]"
+
+    return StreamingResponse(stream_positions(), media_type="application/json")
 
 @app.post("/api/ai/analyze")
 async def analyze_chat(request: AnalyzeRequest):
@@ -277,7 +418,7 @@ Your responses must follow these strict rules:
             response = model.generate_content(enhanced_prompt)
             ai_response = response.candidates[0].content.parts[0].text if response.candidates else "I couldn't generate a response based on the report context."
             
-            mongodb.logPrompt(user_id, request.prompt, ai_response)
+            log_prompt_background(user_id, request.prompt, ai_response)
             return {"type": "text", "content": ai_response}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error processing your request about the weekly IUU report: {str(e)}")
@@ -297,7 +438,7 @@ Your responses must follow these strict rules:
             response = model.generate_content(summary_prompt)
             summary = response.candidates[0].content.parts[0].text if response.candidates else "I was unable to summarize the report."
             
-            mongodb.logPrompt(user_id, request.prompt, summary)
+            log_prompt_background(user_id, request.prompt, summary)
             return {"type": "text", "content": summary}
 
         except Exception as e:
@@ -322,7 +463,7 @@ Your responses must follow these strict rules:
             lng = random_vessel.get("longitude")
 
             content = f"I've found the vessel '{vessel_name}' near {location_str.title()}. Centering the map on it now."
-            mongodb.logPrompt(user_id, request.prompt, content)
+            log_prompt_background(user_id, request.prompt, content)
             
             return {
                 "type": "location", 
@@ -348,7 +489,7 @@ Your responses must follow these strict rules:
             response = model.generate_content(enhanced_prompt)
             ai_response = response.candidates[0].content.parts[0].text if response.candidates else "I couldn't generate a response."
             
-            mongodb.logPrompt(user_id, request.prompt, ai_response)
+            log_prompt_background(user_id, request.prompt, ai_response)
             return {"type": "text", "content": ai_response}
 
         except Exception as e:
@@ -357,7 +498,7 @@ Your responses must follow these strict rules:
 
 
 # Reports: Generate via Gemini (JSON-structured)
-@app.post("/api/reports/generate")
+@app.post("/api/reports/generate", response_model=None)
 async def generate_report(request: ReportGenerateRequest):
     """
     Generate a maritime report as HTML based on selected sections and time window.
@@ -394,50 +535,20 @@ async def generate_report(request: ReportGenerateRequest):
             selected_sections = ["Weekly IUU Activity Analysis"]
 
         # Tone based on clearance level
-        clearance_instructions = {
-            "Public Trust": (
-                "Adopt an accessible, non-sensitive tone suitable for public release. Avoid operationally sensitive details."
-            ),
-            "Confidential": (
-                "Use professional language and include nuanced risk qualifiers. Avoid exact coordinates or personally identifiable information."
-            ),
-            "Top Secret": (
-                "Use precise, analytical tone with crisp recommendations. Do not expose classified sources; summarize methods abstractly."
-            ),
-        }.get(request.clearance, "Use a professional tone appropriate to the audience.")
-
-        # Construct a strict JSON-only instruction so the frontend can render charts with Recharts
-        schema_block = (
-            "\n"  # leading newline for readability
-            "{\n"
-            "  \"executiveSummary\": [\"string paragraph\", \"string paragraph\"],\n"
-            "  \"sections\": [\n"
-            "    {\n"
-            "      \"heading\": \"string\",\n"
-            "      \"content\": [\"string paragraph\"],\n"
-            "      \"chart\": {\n"
-            "        \"type\": \"bar|radial|pie|none\",\n"
-            "        \"callout\": \"string one-sentence chart note\"\n"
-            "      }\n"
-            "    }\n"
-            "  ]\n"
-            "}\n"
-        )
+        clearance_instructions = _CLEARANCE_INSTRUCTIONS.get(request.clearance, _DEFAULT_CLEARANCE_INSTRUCTION)
 
         sections_list = ", ".join(selected_sections)
         report_title = request.title.strip() if request.title and request.title.strip() else "Maritime Operations Report"
         summary_description = f"a summary covering {sections_list} for {time_window_str}"
         intro_sentence = f"This report is titled '{report_title}' and serves as {summary_description}."
 
-        prompt = (
-            f"{intro_sentence}. You are an intelligence analyst assisting a maritime monitoring team working on IUU (Illegal, Unreported, and Unregulated) fishing detection and response. Generate a polished, decision-ready report for the PennApps operational console.\n\n"
-            f"Tailor the content to the audience clearance level \"{request.clearance}\". {clearance_instructions}\n\n"
-            "Return STRICT JSON ONLY (no markdown, no code fences, no prose outside JSON) that conforms to this schema:" + schema_block + "\n"
-            "Rules:\n"
-            "- Include ONLY the requested sections and in a logical order.\n"
-            "- Use careful qualitative language; do not invent precise numbers.\n"
-            "- Keep paragraphs short (2–5 sentences). Avoid lists inside paragraphs.\n"
-        )
+        prompt = "".join((
+            intro_sentence,
+            _REPORT_ROLE,
+            "Tailor the content to the audience clearance level \"", request.clearance, "\". ",
+            clearance_instructions, "\n\n",
+            _REPORT_FORMAT_RULES,
+        ))
 
         response = model.generate_content(prompt)
 
@@ -446,19 +557,12 @@ async def generate_report(request: ReportGenerateRequest):
         else:
             ai_text = "{}"
 
-        # Try to extract JSON (strip code fences if present)
-        text = ai_text.strip()
-        # Remove common code-fence wrappers like ```json ... ```
-        if text.startswith("```json") or text.startswith("```"):
-            first_newline = text.find("\n")
-            if first_newline != -1:
-                text = text[first_newline + 1 :]
-            if text.endswith("```"):
-                text = text[: -3].rstrip()
+        # Pull the JSON object out of any code fences or stray prose around it
+        text = _extract_json_obj(ai_text) or ai_text.strip()
 
         report_json = None
         try:
-            report_json = json.loads(text)
+            report_json = orjson.loads(text)
         except Exception:
             # Fallback minimal structure
             report_json = {
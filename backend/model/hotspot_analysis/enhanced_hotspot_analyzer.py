@@ -10,22 +10,66 @@ Advanced hotspot analysis that incorporates:
 - Risk scoring with multiple factors
 """
 
-import json
+import gzip
 import logging
-import math
 import os
-import csv
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import sys
 
+import numpy as np
+import orjson
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+
 # Add backend to path for MongoDB imports
 sys.path.append(str(Path(__file__).parent.parent.parent / "backend"))
-from api_routes.mongodb import getVesselDataForHotspotAnalysis
+from api_routes.mongodb import getVesselColumnsForHotspotAnalysis
+try:
+    from .hotspot_analyzer import _write_json
+except ImportError:
+    from hotspot_analyzer import _write_json
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371
+
+# Port CSV columns we use, mapped to their short names
+PORT_CSV_COLUMNS = {
+    'Main Port Name': 'name',
+    'Country Code': 'country',
+    'Latitude': 'lat',
+    'Longitude': 'lon',
+    'Harbor Type': 'harbor_type',
+    'Harbor Size': 'harbor_size',
+    'Oil Terminal Depth (m)': 'oil_terminal_depth',
+    'Facilities - Container': 'container',
+    'Harbor Use': 'harbor_use'
+}
+
+# Low-cardinality port columns, stored as categoricals (codes + one copy of each string)
+PORT_CATEGORY_DTYPES = {'country': 'category', 'harbor_type': 'category', 'harbor_size': 'category'}
+
+# Column order of cluster bounds arrays
+BOUNDS_COLUMNS = ('min_lat', 'max_lat', 'min_lon', 'max_lon')
+
+# Default to moderate activity if no fishing season matches
+OFF_SEASON_FACTOR = 0.6
+
+def _day_of_year(month_day: str) -> int:
+    """Day of year (1-366) of an "MM-DD" string, on a leap-year calendar"""
+    return datetime.strptime("2000-" + month_day, "%Y-%m-%d").timetuple().tm_yday
+
+# Cluster centers per port query task
+PORT_QUERY_CHUNK = 256
+
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
 class EnhancedHotspotAnalyzer:
     """
     Enhanced hotspot analysis with auxiliary data integration
@@ -38,6 +82,7 @@ class EnhancedHotspotAnalyzer:
         # Load auxiliary data
         self.port_data = self._load_port_data()
         self.fishing_seasons = self._load_fishing_seasons()
+        self._season_regions, self._season_table = self._build_season_table()
         
         # Analysis parameters
         self.cluster_radius_km = 50
@@ -49,49 +94,132 @@ class EnhancedHotspotAnalyzer:
             "MEDIUM": 0.4,
             "LOW": 0.2
         }
+        # Sorted level boundaries for searchsorted; scores below MEDIUM are LOW
+        self._risk_labels = np.array(["LOW", "MEDIUM", "HIGH", "CRITICAL"])
+        self._risk_bins = np.array([self.risk_thresholds[level] for level in self._risk_labels[1:]])
         
         logger.info(f"📊 Loaded {len(self.port_data)} ports and {len(self.fishing_seasons)} fishing seasons")
     
-    def _load_port_data(self) -> List[Dict]:
+    def _load_port_data(self) -> pd.DataFrame:
         """
         Load port data from CSV file
+        
+        Ports are kept as columns; a port dict is only built for the ports
+        returned by a query. The parsed ports and their BallTree are pickled
+        to `ports_cache.pkl` and reused while the CSV is unchanged.
         """
+        self._port_lats = np.empty(0)
+        self._port_lons = np.empty(0)
+        self._port_tree = None
         try:
             port_file = Path(__file__).parent.parent / "aux_data" / "UpdatedPub150.csv"
             if not port_file.exists():
                 logger.warning("Port data file not found")
-                return []
+                return pd.DataFrame()
             
-            ports = []
-            with open(port_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        lat = float(row.get('Latitude', 0))
-                        lon = float(row.get('Longitude', 0))
-                        if lat != 0 and lon != 0:  # Valid coordinates
-                            ports.append({
-                                'name': row.get('Main Port Name', ''),
-                                'country': row.get('Country Code', ''),
-                                'lat': lat,
-                                'lon': lon,
-                                'harbor_type': row.get('Harbor Type', ''),
-                                'harbor_size': row.get('Harbor Size', ''),
-                                'facilities': {
-                                    'oil_terminal': row.get('Oil Terminal Depth (m)', '0') != '0',
-                                    'container': row.get('Facilities - Container', '') == 'Yes',
-                                    'fishing': row.get('Harbor Use', '').lower().find('fishing') != -1
-                                }
-                            })
-                    except (ValueError, KeyError) as e:
-                        continue  # Skip invalid rows
+            stat = port_file.stat()
+            source_key = (stat.st_mtime_ns, stat.st_size)
+            cache_file = self.analysis_dir / "ports_cache.pkl"
+            cached = self._load_port_cache(cache_file, source_key)
+            if cached:
+                ports, self._port_tree = cached
+            else:
+                ports = self._parse_port_csv(port_file)
+            self._port_columns = {col: ports[col].to_numpy() for col in ports.columns}
             
-            logger.info(f"Loaded {len(ports)} ports")
+            # Port coordinates in radians, indexed for radius queries
+            self._port_lats = np.radians(self._port_columns['lat'])
+            self._port_lons = np.radians(self._port_columns['lon'])
+            if len(ports) and self._port_tree is None:
+                self._port_tree = BallTree(np.column_stack([self._port_lats, self._port_lons]), metric='haversine')
+            
+            if not cached:
+                self._save_port_cache(cache_file, source_key, ports)
+            
+            logger.info(f"Loaded {len(ports)} ports" + (" from cache" if cached else ""))
             return ports
             
         except Exception as e:
             logger.error(f"Error loading port data: {e}")
-            return []
+            return pd.DataFrame()
+    
+    def _parse_port_csv(self, port_file: Path) -> pd.DataFrame:
+        """
+        Parse the needed port columns out of the port CSV
+        """
+        text_columns = [col for col in PORT_CSV_COLUMNS if col not in ('Latitude', 'Longitude')]
+        df = pd.read_csv(
+            port_file, encoding='utf-8-sig', usecols=list(PORT_CSV_COLUMNS),
+            dtype=dict.fromkeys(text_columns, str), keep_default_na=False,
+            float_precision='round_trip'
+        ).rename(columns=PORT_CSV_COLUMNS)
+        
+        # Valid coordinates only; unparseable ones are skipped
+        df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+        df['lon'] = pd.to_numeric(df['lon'], errors='coerce')
+        ports = df[df['lat'].notna() & df['lon'].notna() & (df['lat'] != 0) & (df['lon'] != 0)]
+        
+        return pd.DataFrame({
+            'name': ports['name'],
+            'country': ports['country'],
+            'lat': ports['lat'],
+            'lon': ports['lon'],
+            'harbor_type': ports['harbor_type'],
+            'harbor_size': ports['harbor_size'],
+            'oil_terminal': ports['oil_terminal_depth'] != '0',
+            'container': ports['container'] == 'Yes',
+            'fishing': ports['harbor_use'].str.lower().str.contains('fishing', regex=False)
+        }).reset_index(drop=True).astype(PORT_CATEGORY_DTYPES)
+    
+    def _load_port_cache(self, cache_file: Path, source_key: Tuple[int, int]) -> Optional[Tuple[pd.DataFrame, Optional[BallTree]]]:
+        """
+        Load cached ports and port tree if they were built from this CSV version
+        """
+        try:
+            with open(cache_file, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.get('source_key') != source_key:
+                return None
+            return cache['ports'], cache['tree']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable port cache: {e}")
+            return None
+    
+    def _save_port_cache(self, cache_file: Path, source_key: Tuple[int, int], ports: pd.DataFrame):
+        """
+        Pickle parsed ports and the port tree, atomically replacing the cache
+        """
+        try:
+            tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(
+                    {'source_key': source_key, 'ports': ports, 'tree': self._port_tree},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Could not write port cache: {e}")
+    
+    def _port_record(self, index: int) -> Dict:
+        """
+        Build the port dict for one row of the port columns
+        """
+        cols = self._port_columns
+        return {
+            'name': cols['name'][index],
+            'country': cols['country'][index],
+            'lat': float(cols['lat'][index]),
+            'lon': float(cols['lon'][index]),
+            'harbor_type': cols['harbor_type'][index],
+            'harbor_size': cols['harbor_size'][index],
+            'facilities': {
+                'oil_terminal': bool(cols['oil_terminal'][index]),
+                'container': bool(cols['container'][index]),
+                'fishing': bool(cols['fishing'][index])
+            }
+        }
     
     def _load_fishing_seasons(self) -> Dict[str, Dict]:
         """
@@ -128,7 +256,7 @@ class EnhancedHotspotAnalyzer:
             logger.info("🔍 Starting enhanced hotspot analysis...")
             
             # Get vessel data
-            vessel_data = getVesselDataForHotspotAnalysis(start_date, end_date)
+            vessel_data = getVesselColumnsForHotspotAnalysis(start_date, end_date)
             
             if vessel_data['total_vessels'] == 0:
                 logger.warning("No vessel data available for analysis")
@@ -137,8 +265,8 @@ class EnhancedHotspotAnalyzer:
             logger.info(f"📊 Analyzing {vessel_data['total_vessels']} vessels")
             
             # Find clusters
-            untracked_clusters = self._find_clusters(vessel_data['untracked_vessels'])
-            tracked_clusters = self._find_clusters(vessel_data['tracked_vessels'])
+            untracked_clusters = self._find_clusters(vessel_data['untracked'])
+            tracked_clusters = self._find_clusters(vessel_data['tracked'])
             
             # Calculate enhanced hotspots
             hotspots = self._calculate_enhanced_hotspots(untracked_clusters, tracked_clusters, start_date)
@@ -152,9 +280,9 @@ class EnhancedHotspotAnalyzer:
                 },
                 "data_summary": {
                     "total_vessels": vessel_data['total_vessels'],
-                    "tracked_vessels": len(vessel_data['tracked_vessels']),
-                    "untracked_vessels": len(vessel_data['untracked_vessels']),
-                    "untracked_ratio": len(vessel_data['untracked_vessels']) / vessel_data['total_vessels']
+                    "tracked_vessels": len(vessel_data['tracked']['lat']),
+                    "untracked_vessels": len(vessel_data['untracked']['lat']),
+                    "untracked_ratio": len(vessel_data['untracked']['lat']) / vessel_data['total_vessels']
                 },
                 "auxiliary_data": {
                     "ports_loaded": len(self.port_data),
@@ -175,105 +303,121 @@ class EnhancedHotspotAnalyzer:
             logger.error(f"Error in enhanced hotspot analysis: {e}")
             return self._empty_analysis_result()
     
-    def _find_clusters(self, vessels: List[Dict]) -> List[Dict]:
+    def _find_clusters(self, vessels: Dict[str, np.ndarray]) -> List[Dict]:
         """
         Find clusters of vessels using distance-based clustering
+        
+        `vessels` is a column dict of parallel `lat`/`lon` arrays. Vessels
+        within `cluster_radius_km` of each other are linked by a haversine
+        BallTree radius query, and clusters are the connected components of
+        that neighbor graph. Each cluster keeps its members as an index array
+        and its `bounds` as a row of one (n, 4) array in `BOUNDS_COLUMNS` order.
         """
-        if not vessels:
+        lats = vessels['lat']
+        lons = vessels['lon']
+        n = len(lats)
+        if n == 0:
             return []
         
+        # Neighbor graph from a haversine BallTree radius query. Each link
+        # is kept once (j > i), which also drops the self-links; clusters are
+        # the connected components of the undirected graph, so they do not
+        # depend on vessel order
+        coords = np.radians(np.column_stack([lats, lons]))
+        tree = BallTree(coords, metric='haversine')
+        neighbors = tree.query_radius(coords, r=self.cluster_radius_km / EARTH_RADIUS_KM)
+        rows = np.repeat(np.arange(n), np.fromiter(map(len, neighbors), dtype=np.intp, count=n))
+        cols = np.concatenate(neighbors)
+        upper = cols > rows
+        rows = rows[upper]
+        cols = cols[upper]
+        graph = csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        
+        # Group vessel indices by component and reduce each group in one pass
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels)
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        lat_sorted = lats[order]
+        lon_sorted = lons[order]
+        center_lat = np.add.reduceat(lat_sorted, starts) / counts
+        center_lon = np.add.reduceat(lon_sorted, starts) / counts
+        bounds = np.column_stack([
+            np.minimum.reduceat(lat_sorted, starts),
+            np.maximum.reduceat(lat_sorted, starts),
+            np.minimum.reduceat(lon_sorted, starts),
+            np.maximum.reduceat(lon_sorted, starts)
+        ])
+        members = np.split(order, starts[1:])
+        
+        # Radian centers, reused by the port and tracked-cluster queries
+        center_lat_rad = np.radians(center_lat)
+        center_lon_rad = np.radians(center_lon)
+        
+        # Only keep clusters with minimum vessel count
         clusters = []
-        processed = set()
-        
-        for i, vessel in enumerate(vessels):
-            if i in processed:
-                continue
-                
-            # Start new cluster
-            cluster = {
-                'vessels': [vessel],
-                'center_lat': vessel['lat'],
-                'center_lon': vessel['lon'],
-                'bounds': {
-                    'min_lat': vessel['lat'],
-                    'max_lat': vessel['lat'],
-                    'min_lon': vessel['lon'],
-                    'max_lon': vessel['lon']
-                }
-            }
-            processed.add(i)
-            
-            # Find nearby vessels
-            for j, other_vessel in enumerate(vessels):
-                if j in processed or i == j:
-                    continue
-                    
-                distance = self._calculate_distance(
-                    vessel['lat'], vessel['lon'],
-                    other_vessel['lat'], other_vessel['lon']
-                )
-                
-                if distance <= self.cluster_radius_km:
-                    cluster['vessels'].append(other_vessel)
-                    processed.add(j)
-                    
-                    # Update cluster bounds
-                    cluster['bounds']['min_lat'] = min(cluster['bounds']['min_lat'], other_vessel['lat'])
-                    cluster['bounds']['max_lat'] = max(cluster['bounds']['max_lat'], other_vessel['lat'])
-                    cluster['bounds']['min_lon'] = min(cluster['bounds']['min_lon'], other_vessel['lon'])
-                    cluster['bounds']['max_lon'] = max(cluster['bounds']['max_lon'], other_vessel['lon'])
-            
-            # Only keep clusters with minimum vessel count
-            if len(cluster['vessels']) >= self.min_vessels_for_hotspot:
-                cluster['center_lat'] = sum(v['lat'] for v in cluster['vessels']) / len(cluster['vessels'])
-                cluster['center_lon'] = sum(v['lon'] for v in cluster['vessels']) / len(cluster['vessels'])
-                clusters.append(cluster)
+        for k in np.flatnonzero(counts >= self.min_vessels_for_hotspot):
+            clusters.append({
+                'indices': members[k],
+                'vessel_count': int(counts[k]),
+                'center_lat': float(center_lat[k]),
+                'center_lon': float(center_lon[k]),
+                'center_lat_rad': float(center_lat_rad[k]),
+                'center_lon_rad': float(center_lon_rad[k]),
+                'bounds': bounds[k]
+            })
         
         return clusters
     
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """
-        Calculate distance between two points in kilometers using Haversine formula
-        """
-        R = 6371  # Earth's radius in kilometers
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(dlon/2) * math.sin(dlon/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
-    
     def _calculate_enhanced_hotspots(self, untracked_clusters: List[Dict], tracked_clusters: List[Dict], analysis_date: datetime = None) -> List[Dict]:
         """
         Calculate enhanced hotspots with auxiliary data factors
+        
+        Neighbors, ports and season factors are looked up per cluster, then
+        risk scores are computed for all clusters in one vectorized pass.
         """
-        hotspots = []
+        if not untracked_clusters:
+            return []
+        
+        # Find nearby tracked clusters for every untracked cluster in one batch
+        nearby_tracked_by_cluster = self._find_nearby_tracked_clusters(untracked_clusters, tracked_clusters)
+        
+        # Find nearby ports and fishing season factors
+        nearby_ports_by_cluster = self._find_nearby_ports_batch(untracked_clusters)
+        fishing_factors = self._fishing_factor_batch(
+            np.array([c['center_lat'] for c in untracked_clusters], dtype=float), analysis_date
+        )
+        
+        # Per-cluster columns for the risk score
+        vessel_counts = np.array([c['vessel_count'] for c in untracked_clusters], dtype=float)
+        nearby_tracked_counts = np.array([len(nearby) for nearby in nearby_tracked_by_cluster])
+        tracked_vessel_counts = np.array(
+            [sum(c['vessel_count'] for c in nearby) for nearby in nearby_tracked_by_cluster], dtype=float
+        )
+        closest_port_km = np.array(
+            [ports[0]['distance_km'] if ports else np.nan for ports in nearby_ports_by_cluster], dtype=float
+        )
+        cluster_areas = self._calculate_cluster_areas(untracked_clusters)
+        
+        # Calculate enhanced risk scores
+        risk_scores = self._calculate_enhanced_risk_scores(
+            vessel_counts, nearby_tracked_counts, tracked_vessel_counts,
+            closest_port_km, fishing_factors, cluster_areas
+        )
+        
+        risk_levels = self._determine_risk_levels_batch(risk_scores)
         
+        hotspots = []
         for i, untracked_cluster in enumerate(untracked_clusters):
-            # Find nearby tracked clusters
-            nearby_tracked = self._find_nearby_tracked_clusters(untracked_cluster, tracked_clusters)
-            
-            # Find nearby ports
-            nearby_ports = self._find_nearby_ports(untracked_cluster)
-            
-            # Calculate fishing season factor
-            fishing_factor = self._calculate_fishing_season_factor(untracked_cluster, analysis_date)
-            
-            # Calculate enhanced risk score
-            risk_score = self._calculate_enhanced_risk_score(
-                untracked_cluster, nearby_tracked, nearby_ports, fishing_factor
-            )
-            
-            # Determine risk level
-            risk_level = self._determine_risk_level(risk_score)
+            nearby_tracked = nearby_tracked_by_cluster[i]
+            nearby_ports = nearby_ports_by_cluster[i]
+            fishing_factor = float(fishing_factors[i])
+            risk_score = float(risk_scores[i])
+            risk_level = str(risk_levels[i])
             
             # Calculate metadata
-            vessel_count = len(untracked_cluster['vessels'])
-            total_nearby_vessels = vessel_count + sum(len(c['vessels']) for c in nearby_tracked)
+            vessel_count = untracked_cluster['vessel_count']
+            total_nearby_vessels = vessel_count + int(tracked_vessel_counts[i])
             untracked_ratio = vessel_count / total_nearby_vessels if total_nearby_vessels > 0 else 1.0
             
             # Create enhanced hotspot
@@ -287,7 +431,7 @@ class EnhancedHotspotAnalyzer:
                 "untracked_ratio": round(untracked_ratio, 3),
                 "size": self._calculate_size(risk_score),
                 "color": self._get_risk_color(risk_level),
-                "bounds": untracked_cluster['bounds'],
+                "bounds": dict(zip(BOUNDS_COLUMNS, untracked_cluster['bounds'].tolist())),
                 "nearby_tracked_count": len(nearby_tracked),
                 "nearby_ports": nearby_ports,
                 "fishing_season_factor": round(fishing_factor, 3),
@@ -295,7 +439,7 @@ class EnhancedHotspotAnalyzer:
                     "port_proximity": len(nearby_ports),
                     "fishing_season": fishing_factor,
                     "isolation": 1.0 - (len(nearby_tracked) / 10.0) if nearby_tracked else 1.0,
-                    "density": vessel_count / max(self._calculate_cluster_area(untracked_cluster), 1.0)
+                    "density": float(vessel_counts[i] / cluster_areas[i])
                 },
                 "created_at": datetime.utcnow().isoformat()
             }
@@ -306,137 +450,180 @@ class EnhancedHotspotAnalyzer:
         hotspots.sort(key=lambda x: x['risk_score'], reverse=True)
         return hotspots
     
-    def _find_nearby_tracked_clusters(self, untracked_cluster: Dict, tracked_clusters: List[Dict]) -> List[Dict]:
+    def _find_nearby_tracked_clusters(self, untracked_clusters: List[Dict], tracked_clusters: List[Dict]) -> List[List[Dict]]:
         """
-        Find tracked vessel clusters near an untracked cluster
+        Find tracked vessel clusters near each untracked cluster
+        
+        Tracked centers go into one haversine BallTree that is queried with
+        all untracked centers at once.
         """
-        nearby = []
-        search_radius = self.cluster_radius_km * 2
+        if not untracked_clusters or not tracked_clusters:
+            return [[] for _ in untracked_clusters]
         
-        for tracked_cluster in tracked_clusters:
-            distance = self._calculate_distance(
-                untracked_cluster['center_lat'], untracked_cluster['center_lon'],
-                tracked_cluster['center_lat'], tracked_cluster['center_lon']
-            )
-            
-            if distance <= search_radius:
-                nearby.append(tracked_cluster)
+        tracked_pts = [[c['center_lat_rad'], c['center_lon_rad']] for c in tracked_clusters]
+        untracked_pts = [[c['center_lat_rad'], c['center_lon_rad']] for c in untracked_clusters]
+        tracked_tree = BallTree(tracked_pts, metric='haversine')
+        neighbors = tracked_tree.query_radius(untracked_pts, r=self.cluster_radius_km * 2 / EARTH_RADIUS_KM)
         
-        return nearby
+        return [[tracked_clusters[j] for j in np.sort(idxs)] for idxs in neighbors]
     
     def _find_nearby_ports(self, cluster: Dict) -> List[Dict]:
         """
         Find ports near a cluster
         """
-        nearby_ports = []
+        return self._find_nearby_ports_batch([cluster])[0]
+    
+    def _find_nearby_ports_batch(self, clusters: List[Dict]) -> List[List[Dict]]:
+        """
+        Find ports near each cluster
         
-        for port in self.port_data:
-            distance = self._calculate_distance(
-                cluster['center_lat'], cluster['center_lon'],
-                port['lat'], port['lon']
-            )
-            
-            if distance <= self.port_proximity_km:
-                port_info = port.copy()
-                port_info['distance_km'] = round(distance, 2)
-                nearby_ports.append(port_info)
-        
-        # Sort by distance
-        nearby_ports.sort(key=lambda x: x['distance_km'])
-        return nearby_ports[:5]  # Return top 5 closest ports
+        The port BallTree prunes to the ports within `port_proximity_km`, so
+        distances are only computed for those candidates. Cluster centers are
+        queried in chunks on a thread pool; BallTree queries release the GIL.
+        """
+        if self._port_tree is None or not clusters:
+            return [[] for _ in clusters]
+        
+        centers = np.array([[c['center_lat_rad'], c['center_lon_rad']] for c in clusters])
+        chunks = [centers[i:i + PORT_QUERY_CHUNK] for i in range(0, len(centers), PORT_QUERY_CHUNK)]
+        if len(chunks) == 1:
+            results = [self._query_ports(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), os.cpu_count() or 1)) as pool:
+                results = list(pool.map(self._query_ports, chunks))
+        
+        nearby_ports_by_cluster = []
+        for indices, distances in results:
+            for cluster_indices, cluster_distances in zip(indices, distances):
+                # Top 5 closest ports
+                nearby_ports = []
+                for i, distance in zip(cluster_indices[:5], cluster_distances[:5]):
+                    port_info = self._port_record(i)
+                    port_info['distance_km'] = round(float(distance * EARTH_RADIUS_KM), 2)
+                    nearby_ports.append(port_info)
+                nearby_ports_by_cluster.append(nearby_ports)
+        
+        return nearby_ports_by_cluster
+    
+    def _query_ports(self, centers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ports within `port_proximity_km` of each center (radians), closest first
+        """
+        return self._port_tree.query_radius(
+            centers, r=self.port_proximity_km / EARTH_RADIUS_KM,
+            return_distance=True, sort_results=True
+        )
+    
+    def _build_season_table(self) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        Precompute fishing intensity per (region, day of year)
+        
+        Days are numbered on a leap-year calendar (1-366); seasons whose end
+        is before their start wrap around the new year. Where seasons overlap
+        the first one listed wins.
+        """
+        regions = {name: row for row, name in enumerate(self.fishing_seasons)}
+        table = np.full((len(regions), 367), OFF_SEASON_FACTOR)
+        
+        for name, row in regions.items():
+            assigned = np.zeros(367, dtype=bool)
+            for season_data in self.fishing_seasons[name].get("seasons", {}).values():
+                start = _day_of_year(season_data["start"])
+                end = _day_of_year(season_data["end"])
+                days = np.zeros(367, dtype=bool)
+                if start <= end:
+                    days[start:end + 1] = True
+                else:
+                    days[start:] = True
+                    days[1:end + 1] = True
+                days &= ~assigned
+                table[row, days] = season_data["intensity"]
+                assigned |= days
+        
+        return regions, table
     
     def _calculate_fishing_season_factor(self, cluster: Dict, analysis_date: datetime = None) -> float:
         """
         Calculate fishing season factor based on location and time
         """
+        return float(self._fishing_factor_batch(np.array([cluster['center_lat']]), analysis_date)[0])
+    
+    def _fishing_factor_batch(self, lats: np.ndarray, analysis_date: datetime = None) -> np.ndarray:
+        """
+        Fishing season factors for an array of cluster latitudes
+        """
         if not analysis_date:
             analysis_date = datetime.utcnow()
+        day = _day_of_year(analysis_date.strftime("%m-%d"))
+        
+        # Tropical region: moderate fishing activity year-round
+        factors = np.full(len(lats), 0.8)
+        
+        # Determine region based on latitude (northern / southern hemisphere)
+        for region, mask in (("north_atlantic", lats > 30), ("south_pacific", lats < -30)):
+            row = self._season_regions.get(region)
+            factors[mask] = self._season_table[row, day] if row is not None else OFF_SEASON_FACTOR
         
-        # Determine region based on latitude
-        lat = cluster['center_lat']
-        if lat > 30:  # Northern hemisphere
-            region = "north_atlantic"
-        elif lat < -30:  # Southern hemisphere
-            region = "south_pacific"
-        else:  # Tropical region
-            return 0.8  # Moderate fishing activity year-round
-        
-        # Get current season
-        month_day = analysis_date.strftime("%m-%d")
-        seasons = self.fishing_seasons.get(region, {}).get("seasons", {})
-        
-        for season_name, season_data in seasons.items():
-            if season_data["start"] <= month_day <= season_data["end"]:
-                return season_data["intensity"]
-        
-        # Default to moderate activity if no season matches
-        return 0.6
+        return factors
     
-    def _calculate_enhanced_risk_score(self, untracked_cluster: Dict, nearby_tracked: List[Dict], 
-                                     nearby_ports: List[Dict], fishing_factor: float) -> float:
+    def _calculate_enhanced_risk_scores(self, vessel_counts: np.ndarray, nearby_tracked_counts: np.ndarray,
+                                        tracked_vessel_counts: np.ndarray, closest_port_km: np.ndarray,
+                                        fishing_factors: np.ndarray, cluster_areas: np.ndarray) -> np.ndarray:
         """
-        Calculate enhanced risk score with multiple factors
+        Calculate enhanced risk scores with multiple factors for all clusters
+        
+        `closest_port_km` is NaN for clusters with no port in range.
         """
         # Base score from untracked vessel count
-        base_score = min(len(untracked_cluster['vessels']) / 10.0, 1.0)
+        base_score = np.minimum(vessel_counts / 10.0, 1.0)
         
-        # Isolation factor
-        isolation_factor = 1.0
-        if not nearby_tracked:
-            isolation_factor = 1.5  # Higher risk if no tracked vessels nearby
-        else:
-            tracked_count = sum(len(c['vessels']) for c in nearby_tracked)
-            isolation_factor = max(0.5, 1.0 - (tracked_count / 20.0))
+        # Isolation factor (higher risk if no tracked vessels nearby)
+        isolation_factor = np.where(
+            nearby_tracked_counts == 0, 1.5, np.maximum(0.5, 1.0 - (tracked_vessel_counts / 20.0))
+        )
         
         # Density factor
-        cluster_area = self._calculate_cluster_area(untracked_cluster)
-        density_factor = len(untracked_cluster['vessels']) / max(cluster_area, 1.0)
-        density_factor = min(density_factor, 2.0)
-        
-        # Port proximity factor (higher risk if far from ports)
-        port_factor = 1.0
-        if nearby_ports:
-            closest_port_distance = nearby_ports[0]['distance_km']
-            port_factor = max(0.5, 1.0 - (closest_port_distance / 200.0))  # Normalize to 200km
-        else:
-            port_factor = 1.2  # Higher risk if no ports nearby
+        density_factor = np.minimum(vessel_counts / np.maximum(cluster_areas, 1.0), 2.0)
         
-        # Fishing season factor
-        season_factor = 0.8 + (fishing_factor * 0.4)  # Scale from 0.8 to 1.2
+        # Port proximity factor (higher risk if far from ports, normalized to 200km)
+        port_factor = np.where(
+            np.isnan(closest_port_km), 1.2, np.maximum(0.5, 1.0 - (closest_port_km / 200.0))
+        )
         
-        # Combine all factors
-        risk_score = (base_score * isolation_factor * density_factor * 
-                     port_factor * season_factor)
+        # Fishing season factor
+        season_factor = 0.8 + (fishing_factors * 0.4)  # Scale from 0.8 to 1.2
         
-        # Normalize to 0-1 range
-        return min(risk_score, 1.0)
+        # Combine all factors and normalize to 0-1 range
+        risk_scores = (base_score * isolation_factor * density_factor *
+                       port_factor * season_factor)
+        return np.minimum(risk_scores, 1.0)
     
-    def _calculate_cluster_area(self, cluster: Dict) -> float:
+    def _calculate_cluster_areas(self, clusters: List[Dict]) -> np.ndarray:
         """
-        Calculate approximate area of cluster in square kilometers
+        Calculate approximate area of each cluster in square kilometers
         """
-        bounds = cluster['bounds']
-        lat_range = bounds['max_lat'] - bounds['min_lat']
-        lon_range = bounds['max_lon'] - bounds['min_lon']
+        bounds = np.array([c['bounds'] for c in clusters], dtype=float).reshape(-1, 4)
+        lat_range = bounds[:, 1] - bounds[:, 0]
+        lon_range = bounds[:, 3] - bounds[:, 2]
+        center_lat_rad = np.array([c['center_lat_rad'] for c in clusters], dtype=float)
         
         # Convert to kilometers (approximate)
         lat_km = lat_range * 111.0
-        lon_km = lon_range * 111.0 * math.cos(math.radians(cluster['center_lat']))
+        lon_km = lon_range * 111.0 * np.cos(center_lat_rad)
         
-        return max(lat_km * lon_km, 1.0)
+        return np.maximum(lat_km * lon_km, 1.0)
     
     def _determine_risk_level(self, risk_score: float) -> str:
         """
         Determine risk level based on score
         """
-        if risk_score >= self.risk_thresholds["CRITICAL"]:
-            return "CRITICAL"
-        elif risk_score >= self.risk_thresholds["HIGH"]:
-            return "HIGH"
-        elif risk_score >= self.risk_thresholds["MEDIUM"]:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        return str(self._risk_labels[np.searchsorted(self._risk_bins, risk_score, side='right')])
+    
+    def _determine_risk_levels_batch(self, risk_scores: np.ndarray) -> np.ndarray:
+        """
+        Determine risk levels for an array of scores
+        """
+        return self._risk_labels[np.searchsorted(self._risk_bins, risk_scores, side='right')]
     
     def _calculate_size(self, risk_score: float) -> float:
         """
@@ -495,16 +682,14 @@ class EnhancedHotspotAnalyzer:
         """
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         
-        # Save full analysis
-        analysis_file = self.analysis_dir / f"enhanced_hotspot_analysis_{timestamp}.json"
-        with open(analysis_file, 'w') as f:
-            json.dump(analysis_result, f, indent=2)
+        # Archive full analysis (gzipped; these are only kept for the record)
+        analysis_file = self.analysis_dir / f"enhanced_hotspot_analysis_{timestamp}.json.gz"
+        with gzip.open(analysis_file, 'wb', compresslevel=3) as f:
+            f.write(orjson.dumps(analysis_result, option=JSON_OPTIONS))
         
         # Save top hotspots for quick access
         top_hotspots = analysis_result['hotspots'][:50]  # Top 50
-        top_hotspots_file = self.analysis_dir / "top_hotspots.json"
-        with open(top_hotspots_file, 'w') as f:
-            json.dump(top_hotspots, f, indent=2)
+        _write_json(self.analysis_dir / "top_hotspots.json", top_hotspots, option=JSON_OPTIONS)
         
         # Save summary
         summary = {
@@ -514,9 +699,7 @@ class EnhancedHotspotAnalyzer:
             "data_summary": analysis_result['data_summary'],
             "auxiliary_data": analysis_result['auxiliary_data']
         }
-        summary_file = self.analysis_dir / "hotspot_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        _write_json(self.analysis_dir / "hotspot_summary.json", summary, option=JSON_OPTIONS)
         
         logger.info(f"💾 Enhanced analysis results saved to {self.analysis_dir}")
     
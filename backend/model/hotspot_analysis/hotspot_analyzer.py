@@ -11,19 +11,34 @@ Clean hotspot analysis system that:
 
 import json
 import logging
-import math
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import sys
 
+import numpy as np
+import orjson
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+
 # Add backend to path for MongoDB imports
 sys.path.append(str(Path(__file__).parent.parent.parent / "backend"))
-from api_routes.mongodb import getVesselDataForHotspotAnalysis
+from api_routes.mongodb import getVesselColumnsForHotspotAnalysis
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371
+
+def _write_json(path: Path, payload: Any, option: int = orjson.OPT_INDENT_2):
+    """Serialize payload with orjson and atomically replace path with it"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(payload, option=option))
+    os.replace(tmp_path, path)
+
 class HotspotAnalyzer:
     """
     Main hotspot analysis class
@@ -51,7 +66,7 @@ class HotspotAnalyzer:
             logger.info("🔍 Starting hotspot analysis...")
             
             # Get vessel data
-            vessel_data = getVesselDataForHotspotAnalysis(start_date, end_date)
+            vessel_data = getVesselColumnsForHotspotAnalysis(start_date, end_date)
             
             if vessel_data['total_vessels'] == 0:
                 logger.warning("No vessel data available for analysis")
@@ -60,8 +75,8 @@ class HotspotAnalyzer:
             logger.info(f"📊 Analyzing {vessel_data['total_vessels']} vessels")
             
             # Find clusters
-            untracked_clusters = self._find_clusters(vessel_data['untracked_vessels'])
-            tracked_clusters = self._find_clusters(vessel_data['tracked_vessels'])
+            untracked_clusters = self._find_clusters(vessel_data['untracked'])
+            tracked_clusters = self._find_clusters(vessel_data['tracked'])
             
             # Calculate hotspots
             hotspots = self._calculate_hotspots(untracked_clusters, tracked_clusters)
@@ -75,9 +90,9 @@ class HotspotAnalyzer:
                 },
                 "data_summary": {
                     "total_vessels": vessel_data['total_vessels'],
-                    "tracked_vessels": len(vessel_data['tracked_vessels']),
-                    "untracked_vessels": len(vessel_data['untracked_vessels']),
-                    "untracked_ratio": len(vessel_data['untracked_vessels']) / vessel_data['total_vessels']
+                    "tracked_vessels": len(vessel_data['tracked']['lat']),
+                    "untracked_vessels": len(vessel_data['untracked']['lat']),
+                    "untracked_ratio": len(vessel_data['untracked']['lat']) / vessel_data['total_vessels']
                 },
                 "hotspots": hotspots,
                 "statistics": self._calculate_statistics(hotspots),
@@ -94,112 +109,135 @@ class HotspotAnalyzer:
             logger.error(f"Error in hotspot analysis: {e}")
             return self._empty_analysis_result()
     
-    def _find_clusters(self, vessels: List[Dict]) -> List[Dict]:
+    def _find_clusters(self, vessels: Dict[str, np.ndarray]) -> List[Dict]:
         """
         Find clusters of vessels using distance-based clustering
-        """
-        if not vessels:
+        
+        `vessels` is a column dict of parallel `lat`/`lon` arrays. Vessels
+        within `cluster_radius_km` of each other are linked, and clusters are
+        the connected components of that neighbor graph.
+        """
+        lats = vessels['lat']
+        lons = vessels['lon']
+        n = len(lats)
+        if n == 0:
             return []
         
-        clusters = []
-        processed = set()
+        # Neighbor graph from a haversine BallTree radius query
+        coords = np.radians(np.column_stack([lats, lons]))
+        tree = BallTree(coords, metric='haversine')
+        neighbors = tree.query_radius(coords, r=self.cluster_radius_km / EARTH_RADIUS_KM)
+        rows = np.repeat(np.arange(n), [len(nbrs) for nbrs in neighbors])
+        cols = np.concatenate(neighbors)
+        graph = csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
         
-        for i, vessel in enumerate(vessels):
-            if i in processed:
-                continue
-                
-            # Start new cluster
-            cluster = {
-                'vessels': [vessel],
-                'center_lat': vessel['lat'],
-                'center_lon': vessel['lon'],
+        # Group vessel indices by component and reduce each group in one pass
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+        counts = np.diff(np.r_[starts, n])
+        lat_sorted = lats[order]
+        lon_sorted = lons[order]
+        center_lat = np.add.reduceat(lat_sorted, starts) / counts
+        center_lon = np.add.reduceat(lon_sorted, starts) / counts
+        min_lat = np.minimum.reduceat(lat_sorted, starts)
+        max_lat = np.maximum.reduceat(lat_sorted, starts)
+        min_lon = np.minimum.reduceat(lon_sorted, starts)
+        max_lon = np.maximum.reduceat(lon_sorted, starts)
+        members = np.split(order, starts[1:])
+        
+        # Only keep clusters with minimum vessel count
+        clusters = []
+        for k in np.flatnonzero(counts >= self.min_vessels_for_hotspot):
+            clusters.append({
+                'indices': members[k],
+                'vessel_count': int(counts[k]),
+                'center_lat': float(center_lat[k]),
+                'center_lon': float(center_lon[k]),
                 'bounds': {
-                    'min_lat': vessel['lat'],
-                    'max_lat': vessel['lat'],
-                    'min_lon': vessel['lon'],
-                    'max_lon': vessel['lon']
+                    'min_lat': float(min_lat[k]),
+                    'max_lat': float(max_lat[k]),
+                    'min_lon': float(min_lon[k]),
+                    'max_lon': float(max_lon[k])
                 }
-            }
-            processed.add(i)
-            
-            # Find nearby vessels
-            for j, other_vessel in enumerate(vessels):
-                if j in processed or i == j:
-                    continue
-                    
-                distance = self._calculate_distance(
-                    vessel['lat'], vessel['lon'],
-                    other_vessel['lat'], other_vessel['lon']
-                )
-                
-                if distance <= self.cluster_radius_km:
-                    cluster['vessels'].append(other_vessel)
-                    processed.add(j)
-                    
-                    # Update cluster bounds
-                    cluster['bounds']['min_lat'] = min(cluster['bounds']['min_lat'], other_vessel['lat'])
-                    cluster['bounds']['max_lat'] = max(cluster['bounds']['max_lat'], other_vessel['lat'])
-                    cluster['bounds']['min_lon'] = min(cluster['bounds']['min_lon'], other_vessel['lon'])
-                    cluster['bounds']['max_lon'] = max(cluster['bounds']['max_lon'], other_vessel['lon'])
-            
-            # Only keep clusters with minimum vessel count
-            if len(cluster['vessels']) >= self.min_vessels_for_hotspot:
-                cluster['center_lat'] = sum(v['lat'] for v in cluster['vessels']) / len(cluster['vessels'])
-                cluster['center_lon'] = sum(v['lon'] for v in cluster['vessels']) / len(cluster['vessels'])
-                clusters.append(cluster)
+            })
         
         return clusters
     
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    def _haversine_matrix(self, lat1: np.ndarray, lon1: np.ndarray,
+                          lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
         """
-        Calculate distance between two points in kilometers using Haversine formula
+        Pairwise Haversine distances (km) between two sets of points
         """
-        R = 6371  # Earth's radius in kilometers
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        R = EARTH_RADIUS_KM
         
-        a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(dlon/2) * math.sin(dlon/2))
+        lat1_rad = np.radians(lat1)[:, None]
+        lat2_rad = np.radians(lat2)[None, :]
+        dlat = lat2_rad - lat1_rad
+        dlon = np.radians(lon2)[None, :] - np.radians(lon1)[:, None]
         
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+        return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
     
     def _calculate_hotspots(self, untracked_clusters: List[Dict], tracked_clusters: List[Dict]) -> List[Dict]:
         """
         Calculate hotspot risk scores and metadata
+        
+        All per-cluster statistics are computed in one vectorized pass over
+        column arrays; dicts are only built for the final output.
         """
-        hotspots = []
+        if not untracked_clusters:
+            return []
+        
+        # Per-cluster columns
+        uc_lat = np.array([c['center_lat'] for c in untracked_clusters], dtype=float)
+        uc_lon = np.array([c['center_lon'] for c in untracked_clusters], dtype=float)
+        uc_size = np.array([c['vessel_count'] for c in untracked_clusters], dtype=float)
+        uc_lat_range = np.array([c['bounds']['max_lat'] - c['bounds']['min_lat'] for c in untracked_clusters], dtype=float)
+        uc_lon_range = np.array([c['bounds']['max_lon'] - c['bounds']['min_lon'] for c in untracked_clusters], dtype=float)
         
+        # Approximate cluster area in km² (1 degree ≈ 111 km, scaled by cos(lat) for longitude)
+        uc_cos_lat = np.cos(np.radians(uc_lat))
+        uc_area = np.maximum(111.0 * 111.0 * uc_cos_lat * uc_lat_range * uc_lon_range, 1.0)
+        
+        # Tracked clusters within 2x the cluster radius of each untracked cluster
+        if tracked_clusters:
+            tc_lat = np.array([c['center_lat'] for c in tracked_clusters], dtype=float)
+            tc_lon = np.array([c['center_lon'] for c in tracked_clusters], dtype=float)
+            tc_size = np.array([c['vessel_count'] for c in tracked_clusters], dtype=float)
+            dists = self._haversine_matrix(uc_lat, uc_lon, tc_lat, tc_lon)
+            near_mask = dists <= self.cluster_radius_km * 2
+            tracked_sum = near_mask.astype(float) @ tc_size
+            nearby_count = near_mask.sum(axis=1)
+        else:
+            tracked_sum = np.zeros_like(uc_size)
+            nearby_count = np.zeros(len(untracked_clusters), dtype=int)
+        
+        # Risk factors: base count, isolation from tracked traffic, density
+        base = np.minimum(uc_size / 10.0, 1.0)
+        isolation = np.where(nearby_count == 0, 1.5, np.maximum(0.5, 1.0 - tracked_sum / 20.0))
+        density = np.minimum(uc_size / np.maximum(uc_area, 1.0), 2.0)
+        risk = np.minimum(base * isolation * density, 1.0)
+        untracked_ratio = uc_size / (uc_size + tracked_sum)
+        
+        hotspots = []
         for i, untracked_cluster in enumerate(untracked_clusters):
-            # Find nearby tracked clusters
-            nearby_tracked = self._find_nearby_tracked_clusters(untracked_cluster, tracked_clusters)
-            
-            # Calculate risk score
-            risk_score = self._calculate_risk_score(untracked_cluster, nearby_tracked)
-            
-            # Determine risk level
+            risk_score = float(risk[i])
             risk_level = self._determine_risk_level(risk_score)
             
-            # Calculate metadata
-            vessel_count = len(untracked_cluster['vessels'])
-            total_nearby_vessels = vessel_count + sum(len(c['vessels']) for c in nearby_tracked)
-            untracked_ratio = vessel_count / total_nearby_vessels if total_nearby_vessels > 0 else 1.0
-            
-            # Create hotspot
             hotspot = {
                 "id": f"hotspot_{i+1}",
                 "lat": untracked_cluster['center_lat'],
                 "lon": untracked_cluster['center_lon'],
                 "risk_score": round(risk_score, 3),
                 "risk_level": risk_level,
-                "vessel_count": vessel_count,
-                "untracked_ratio": round(untracked_ratio, 3),
+                "vessel_count": int(uc_size[i]),
+                "untracked_ratio": round(float(untracked_ratio[i]), 3),
                 "size": self._calculate_size(risk_score),
                 "color": self._get_risk_color(risk_level),
                 "bounds": untracked_cluster['bounds'],
-                "nearby_tracked_count": len(nearby_tracked),
+                "nearby_tracked_count": int(nearby_count[i]),
                 "created_at": datetime.utcnow().isoformat()
             }
             
@@ -209,62 +247,6 @@ class HotspotAnalyzer:
         hotspots.sort(key=lambda x: x['risk_score'], reverse=True)
         return hotspots
     
-    def _find_nearby_tracked_clusters(self, untracked_cluster: Dict, tracked_clusters: List[Dict]) -> List[Dict]:
-        """
-        Find tracked vessel clusters near an untracked cluster
-        """
-        nearby = []
-        search_radius = self.cluster_radius_km * 2
-        
-        for tracked_cluster in tracked_clusters:
-            distance = self._calculate_distance(
-                untracked_cluster['center_lat'], untracked_cluster['center_lon'],
-                tracked_cluster['center_lat'], tracked_cluster['center_lon']
-            )
-            
-            if distance <= search_radius:
-                nearby.append(tracked_cluster)
-        
-        return nearby
-    
-    def _calculate_risk_score(self, untracked_cluster: Dict, nearby_tracked: List[Dict]) -> float:
-        """
-        Calculate risk score based on vessel density and isolation
-        """
-        # Base score from untracked vessel count
-        base_score = min(len(untracked_cluster['vessels']) / 10.0, 1.0)
-        
-        # Isolation factor
-        isolation_factor = 1.0
-        if not nearby_tracked:
-            isolation_factor = 1.5  # Higher risk if no tracked vessels nearby
-        else:
-            tracked_count = sum(len(c['vessels']) for c in nearby_tracked)
-            isolation_factor = max(0.5, 1.0 - (tracked_count / 20.0))
-        
-        # Density factor
-        cluster_area = self._calculate_cluster_area(untracked_cluster)
-        density_factor = len(untracked_cluster['vessels']) / max(cluster_area, 1.0)
-        density_factor = min(density_factor, 2.0)
-        
-        # Combine factors
-        risk_score = base_score * isolation_factor * density_factor
-        return min(risk_score, 1.0)
-    
-    def _calculate_cluster_area(self, cluster: Dict) -> float:
-        """
-        Calculate approximate area of cluster in square kilometers
-        """
-        bounds = cluster['bounds']
-        lat_range = bounds['max_lat'] - bounds['min_lat']
-        lon_range = bounds['max_lon'] - bounds['min_lon']
-        
-        # Convert to kilometers (approximate)
-        lat_km = lat_range * 111.0
-        lon_km = lon_range * 111.0 * math.cos(math.radians(cluster['center_lat']))
-        
-        return max(lat_km * lon_km, 1.0)
-    
     def _determine_risk_level(self, risk_score: float) -> str:
         """
         Determine risk level based on score
@@ -333,20 +315,14 @@ class HotspotAnalyzer:
         """
         Save analysis results to files
         """
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        
-        # Save full analysis
-        analysis_file = self.analysis_dir / f"hotspot_analysis_{timestamp}.json"
-        with open(analysis_file, 'w') as f:
-            json.dump(analysis_result, f, indent=2)
+        # Full analysis (only the latest run is kept)
+        analysis_file = self.analysis_dir / "hotspot_analysis_latest.json"
         
-        # Save top hotspots for quick access
+        # Top hotspots for quick access
         top_hotspots = analysis_result['hotspots'][:50]  # Top 50
         top_hotspots_file = self.analysis_dir / "top_hotspots.json"
-        with open(top_hotspots_file, 'w') as f:
-            json.dump(top_hotspots, f, indent=2)
         
-        # Save summary
+        # Summary
         summary = {
             "timestamp": analysis_result['analysis_timestamp'],
             "total_hotspots": analysis_result['statistics']['total_hotspots'],
@@ -354,8 +330,18 @@ class HotspotAnalyzer:
             "data_summary": analysis_result['data_summary']
         }
         summary_file = self.analysis_dir / "hotspot_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        
+        # The three files are independent, so write them concurrently
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(
+                _write_json,
+                [analysis_file, top_hotspots_file, summary_file],
+                [analysis_result, top_hotspots, summary]
+            ))
+        
+        # One-line audit trail of past runs
+        with open(self.analysis_dir / "history.jsonl", 'ab') as f:
+            f.write(orjson.dumps(summary) + b"\n")
         
         logger.info(f"💾 Analysis results saved to {self.analysis_dir}")
     
@@ -387,15 +373,12 @@ class HotspotAnalyzer:
         Load the most recent analysis results
         """
         try:
-            # Look for the most recent analysis file
-            analysis_files = list(self.analysis_dir.glob("hotspot_analysis_*.json"))
-            if not analysis_files:
+            latest_file = self.analysis_dir / "hotspot_analysis_latest.json"
+            if not latest_file.exists():
                 return None
             
-            latest_file = max(analysis_files, key=os.path.getctime)
-            
-            with open(latest_file, 'r') as f:
-                return json.load(f)
+            with open(latest_file, 'rb') as f:
+                return orjson.loads(f.read())
                 
         except Exception as e:
             logger.error(f"Error loading latest analysis: {e}")
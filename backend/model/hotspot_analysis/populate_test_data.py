@@ -8,13 +8,16 @@ Creates sample vessel data for testing hotspot analysis
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import random
-import math
+
+import numpy as np
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent.parent / "backend"))
 
-from api_routes.mongodb import logAISPosition
+from api_routes.mongodb import logAISPositionBatch
+
+# Vessels per insert_many round-trip
+INSERT_BATCH_SIZE = 500
 
 def generate_test_vessels():
     """
@@ -32,46 +35,66 @@ def generate_test_vessels():
     ]
     
     vessel_count = 0
+    batch = []
+    
+    def flush():
+        nonlocal vessel_count
+        try:
+            vessel_count += logAISPositionBatch(batch, INSERT_BATCH_SIZE)
+        except Exception as e:
+            print(f"Error logging batch of {len(batch)} vessels: {e}")
+        batch.clear()
+    
+    rng = np.random.default_rng()
+    vessel_types = np.array(["Fishing", "Cargo", "Tanker", "Unknown"])
     
     for area_lat, area_lon, radius_km in hotspot_areas:
-        # Generate 10-20 vessels per area
-        num_vessels = random.randint(10, 20)
+        # Generate 10-20 vessels per area, all fields in one batch
+        n = int(rng.integers(10, 21))
+        
+        # Random positions within area
+        angles = rng.uniform(0, 2 * np.pi, n)
+        distances_km = rng.uniform(0, radius_km, n)
         
-        for i in range(num_vessels):
-            # Generate random position within area
-            angle = random.uniform(0, 2 * math.pi)
-            distance_km = random.uniform(0, radius_km)
-            
-            # Convert to lat/lon offset
-            lat_offset = (distance_km * math.cos(angle)) / 111.0  # 1 degree ≈ 111 km
-            lon_offset = (distance_km * math.sin(angle)) / (111.0 * math.cos(math.radians(area_lat)))
-            
-            vessel_lat = area_lat + lat_offset
-            vessel_lon = area_lon + lon_offset
-            
-            # Random timestamp within last 24 hours
-            timestamp = datetime.utcnow() - timedelta(hours=random.uniform(0, 24))
-            
-            # Random vessel type (70% untracked, 30% tracked)
-            is_tracked = random.random() < 0.3
-            
-            vessel_data = {
-                "mmsi": f"{random.randint(100000000, 999999999)}",
-                "lat": vessel_lat,
-                "lon": vessel_lon,
-                "timestamp": timestamp.isoformat(),
-                "source": "AIS" if is_tracked else "SAR",
-                "vessel_type": random.choice(["Fishing", "Cargo", "Tanker", "Unknown"]),
-                "speed": random.uniform(0, 15),
-                "heading": random.uniform(0, 360),
-                "registered": is_tracked
+        # Convert to lat/lon offsets (1 degree ≈ 111 km)
+        vessel_lats = area_lat + (distances_km * np.cos(angles)) / 111.0
+        vessel_lons = area_lon + (distances_km * np.sin(angles)) / (111.0 * np.cos(np.radians(area_lat)))
+        
+        # Random timestamps within last 24 hours
+        now = datetime.utcnow()
+        timestamps = [(now - timedelta(hours=h)).isoformat() for h in rng.uniform(0, 24, n).tolist()]
+        
+        # Random vessel type (70% untracked, 30% tracked)
+        is_tracked = (rng.random(n) < 0.3).tolist()
+        
+        batch.extend(
+            {
+                "mmsi": str(mmsi),
+                "lat": lat,
+                "lon": lon,
+                "timestamp": timestamp,
+                "source": "AIS" if tracked else "SAR",
+                "vessel_type": vessel_type,
+                "speed": speed,
+                "heading": heading,
+                "registered": tracked
             }
-            
-            try:
-                logAISPosition(vessel_data)
-                vessel_count += 1
-            except Exception as e:
-                print(f"Error logging vessel {i}: {e}")
+            for mmsi, lat, lon, timestamp, tracked, vessel_type, speed, heading in zip(
+                rng.integers(100000000, 1000000000, n).tolist(),
+                vessel_lats.tolist(),
+                vessel_lons.tolist(),
+                timestamps,
+                is_tracked,
+                rng.choice(vessel_types, n).tolist(),
+                rng.uniform(0, 15, n).tolist(),
+                rng.uniform(0, 360, n).tolist()
+            )
+        )
+        if len(batch) >= INSERT_BATCH_SIZE:
+            flush()
+    
+    if batch:
+        flush()
     
     print(f"✅ Generated {vessel_count} test vessels")
     return vessel_count
@@ -1,11 +1,19 @@
 from api_routes import mongodb
 import os
-import json
+import ijson
+
+BATCH_SIZE = 1000
 
 filepath = "SAR_Raw_data/vessels.json"
-with open(filepath, "r") as f:
-    data = json.load(f)
-    total = len(data)
-    for i,vessel in enumerate(data):
-        print(f"{i/total*100}%")
-        mongodb.logPos(vessel["lat"],vessel["lon"],vessel["matched"],vessel["raw_data"])
+with open(filepath, "rb") as f:
+    # Stream the top-level array one vessel at a time instead of loading the whole file
+    batch = []
+    i = 0
+    for i,vessel in enumerate(ijson.items(f, "item", use_float=True), 1):
+        batch.append(mongodb.positionDoc(vessel["lat"],vessel["lon"],vessel["matched"],vessel["raw_data"]))
+        if len(batch) == BATCH_SIZE:
+            mongodb.logPosBulk(batch)
+            batch = []
+            print(f"{i} vessels stored")
+    mongodb.logPosBulk(batch)
+    print(f"done, {i} vessels stored")
@@ -9,23 +9,96 @@ Advanced hotspot detection service that integrates:
 - Enhanced statistical models for hotspot detection
 """
 
+import asyncio
 import logging
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from scipy.spatial.distance import cdist
-from sklearn.neighbors import KernelDensity
+from scipy.ndimage import gaussian_filter, distance_transform_edt, maximum_filter
+from numba import njit, prange
+from dataclasses import dataclass
+from functools import lru_cache
+from copy import deepcopy
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import MongoDB functions
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from api_routes.mongodb import getVesselDataForHotspotAnalysis
+from api_routes.mongodb import getVesselMonthColumnsForHotspotAnalysis
 
 logger = logging.getLogger(__name__)
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _fused_risk_surface(untracked, tracked, isolation, expected_activity,
+                        w_density_ratio, w_seasonal_deviation, w_isolation, w_environmental):
+    """Weighted risk per grid cell over flat arrays, without per-term temporaries"""
+    out = np.empty_like(untracked)
+    inv_expected = 1.0 / (expected_activity + 0.001)
+    for i in prange(untracked.size):
+        u = untracked[i]
+        out[i] = (
+            w_density_ratio * u / (tracked[i] + 0.001) +
+            w_seasonal_deviation * abs(u - expected_activity) * inv_expected +
+            w_isolation * isolation[i] +
+            w_environmental
+        )
+    return out
+
+# Exact (unbinned) KDE is cheap enough below these sizes; above them use the binned filter
+DIRECT_KDE_MAX_VESSELS = 10_000
+DIRECT_KDE_MAX_CELLS = 1_000_000
+DIRECT_KDE_CHUNK = 256
+
+def _direct_gauss_kde(lats: np.ndarray, lons: np.ndarray, grid_lats: np.ndarray,
+                      grid_lons: np.ndarray, bandwidth: float) -> np.ndarray:
+    """Gaussian KDE evaluated directly on the grid (same scaling as KernelDensity.score_samples)"""
+    # The 2D kernel factors into lat and lon terms, so each chunk of vessels is
+    # one (n_lat x chunk) @ (chunk x n_lon) product in float32
+    inv_two_h2 = np.float32(1.0 / (2 * bandwidth * bandwidth))
+    grid_lats = grid_lats.astype(np.float32)[:, None]
+    grid_lons = grid_lons.astype(np.float32)[:, None]
+    density = np.zeros((len(grid_lats), len(grid_lons)), dtype=np.float32)
+    lats = np.asarray(lats, dtype=np.float32)
+    lons = np.asarray(lons, dtype=np.float32)
+    
+    for start in range(0, len(lats), DIRECT_KDE_CHUNK):
+        chunk_lats = lats[start:start + DIRECT_KDE_CHUNK]
+        chunk_lons = lons[start:start + DIRECT_KDE_CHUNK]
+        k_lat = np.exp(-np.square(grid_lats - chunk_lats) * inv_two_h2)
+        k_lon = np.exp(-np.square(grid_lons - chunk_lons) * inv_two_h2)
+        density += k_lat @ k_lon.T
+    
+    density /= len(lats) * 2 * np.pi * bandwidth * bandwidth
+    return density
+
+@dataclass
+class VesselArrays:
+    """Columnar (SoA) vessel positions for the grid-based analysis"""
+    lats: np.ndarray  # float32
+    lons: np.ndarray  # float32
+    months: np.ndarray  # int8, 0 when the timestamp is missing or unparseable
+    tracked_mask: np.ndarray  # bool
+    
+    @classmethod
+    def from_columns(cls, columns: Dict) -> "VesselArrays":
+        """Wrap getVesselMonthColumnsForHotspotAnalysis output"""
+        return cls(lats=columns['lat'], lons=columns['lon'],
+                   months=columns['month'], tracked_mask=columns['tracked'])
+    
+    def coords_by_month(self) -> Dict[tuple, tuple]:
+        """(month, tracked) -> (lats, lons) slices, gathered with one stable sort"""
+        key = self.months.astype(np.int16) * 2 + self.tracked_mask
+        order = np.argsort(key, kind='stable')
+        lats = self.lats[order]
+        lons = self.lons[order]
+        edges = np.searchsorted(key[order], np.arange(27))  # keys run 0..25
+        return {
+            (k // 2, bool(k % 2)): (lats[edges[k]:edges[k + 1]], lons[edges[k]:edges[k + 1]])
+            for k in range(26)
+        }
+
 class SeasonalFishingAPI:
     """API client for seasonal fishing information"""
     
@@ -40,24 +113,31 @@ class SeasonalFishingAPI:
             # This would integrate with real APIs in production
             # For now, return mock data based on known patterns
             
+            # Quantize location so nearby lookups share cache entries
+            lat, lon = round(lat, 1), round(lon, 1)
+            
             # Determine fishing season based on location and month
             fishing_season = self._determine_fishing_season(lat, lon, month)
             
             # Get species-specific patterns
-            species_patterns = await self._get_species_patterns(lat, lon, month)
+            species_patterns = self._get_species_patterns(lat, lon, month)
             
+            # The lookups are memoized, so hand out copies; a caller editing
+            # its result must not change the cached patterns for this cell
             return {
                 'fishing_season': fishing_season,
-                'species_patterns': species_patterns,
+                'species_patterns': deepcopy(species_patterns),
                 'expected_activity': self._calculate_expected_activity(lat, lon, month),
-                'fishing_gear_types': self._get_gear_types(lat, lon, month),
-                'regulatory_periods': self._get_regulatory_periods(lat, lon, month)
+                'fishing_gear_types': list(self._get_gear_types(lat, lon, month)),
+                'regulatory_periods': deepcopy(self._get_regulatory_periods(lat, lon, month))
             }
         except Exception as e:
             logger.error(f"Error getting seasonal fishing patterns: {e}")
             return self._get_default_patterns()
     
-    def _determine_fishing_season(self, lat: float, lon: float, month: int) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _determine_fishing_season(lat: float, lon: float, month: int) -> str:
         """Determine fishing season based on location and month"""
         # Northern hemisphere patterns
         if lat > 0:
@@ -75,7 +155,9 @@ class SeasonalFishingAPI:
             else:
                 return "moderate_season"
     
-    async def _get_species_patterns(self, lat: float, lon: float, month: int) -> Dict[str, Any]:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_species_patterns(lat: float, lon: float, month: int) -> Dict[str, Any]:
         """Get species-specific fishing patterns"""
         # Mock data - in production, this would query real fisheries databases
         species_data = {
@@ -101,22 +183,24 @@ class SeasonalFishingAPI:
         
         return species_data
     
-    def _calculate_expected_activity(self, lat: float, lon: float, month: int) -> float:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _calculate_expected_activity(lat: float, lon: float, month: int) -> float:
         """Calculate expected fishing activity level (0-1)"""
         base_activity = 0.5
         
         # Seasonal adjustment
-        season = self._determine_fishing_season(lat, lon, month)
+        season = SeasonalFishingAPI._determine_fishing_season(lat, lon, month)
         if season == "peak_season":
             base_activity *= 1.5
         elif season == "low_season":
             base_activity *= 0.3
         
-        # Add some randomness
-        noise = np.random.normal(0, 0.1)
-        return max(0, min(1, base_activity + noise))
+        return max(0, min(1, base_activity))
     
-    def _get_gear_types(self, lat: float, lon: float, month: int) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_gear_types(lat: float, lon: float, month: int) -> List[str]:
         """Get expected fishing gear types for location and month"""
         # Mock data - would be based on real fisheries data
         if lat > 50:  # High latitude
@@ -126,7 +210,9 @@ class SeasonalFishingAPI:
         else:  # Low latitude
             return ['purse_seine', 'longline', 'handline']
     
-    def _get_regulatory_periods(self, lat: float, lon: float, month: int) -> Dict[str, Any]:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_regulatory_periods(lat: float, lon: float, month: int) -> Dict[str, Any]:
         """Get regulatory periods and restrictions"""
         # Mock data - would integrate with real regulatory databases
         return {
@@ -156,6 +242,7 @@ class EnhancedHotspotDetector:
         self.spatial_grid = None
         self.grid_resolution = 0.01  # ~1km resolution
         self.bounds = None
+        self._footprint_3x3 = np.ones((3, 3), dtype=bool)  # local-maximum neighbourhood
         
         # Model parameters
         self.risk_weights = {
@@ -170,25 +257,39 @@ class EnhancedHotspotDetector:
         try:
             logger.info("🚀 Starting enhanced hotspot analysis...")
             
-            # Get vessel data from MongoDB
-            vessel_data = getVesselDataForHotspotAnalysis(start_date, end_date)
+            # Get vessel columns from MongoDB (month and tracked status derived server-side)
+            vessel_data = getVesselMonthColumnsForHotspotAnalysis(start_date, end_date)
             logger.info(f"📊 Retrieved {vessel_data['total_vessels']} vessels from MongoDB")
             
             if vessel_data['total_vessels'] == 0:
                 logger.warning("No vessel data found for analysis")
                 return {'hotspots': [], 'analysis_metadata': {'error': 'No data available'}}
             
+            # Columnar view of the vessels for the grid and per-month passes
+            vessel_arrays = VesselArrays.from_columns(vessel_data)
+            
             # Create spatial grid
-            self._create_spatial_grid(vessel_data)
+            self._create_spatial_grid(vessel_arrays)
+            
+            # Process monthly data; months are independent, so analyze them concurrently
+            month_coords = vessel_arrays.coords_by_month()
+            month_datas = {
+                month: self._filter_data_by_month(month_coords, month)
+                for month in range(1, 13)  # Process all 12 months
+            }
+            months = [month for month, month_data in month_datas.items() if month_data['total_vessels'] > 0]
+            semaphore = asyncio.Semaphore(4)  # Bound concurrent seasonal API lookups
             
-            # Process monthly data
-            monthly_results = {}
-            for month in range(1, 13):  # Process all 12 months
-                month_data = self._filter_data_by_month(vessel_data, month)
-                if len(month_data['tracked_vessels']) > 0 or len(month_data['untracked_vessels']) > 0:
-                    month_result = await self._analyze_month(month_data, month)
-                    if month_result:
-                        monthly_results[month] = month_result
+            async def analyze_bounded(month: int) -> Optional[Dict]:
+                async with semaphore:
+                    return await self._analyze_month(month_datas[month], month)
+            
+            results = await asyncio.gather(*(analyze_bounded(month) for month in months))
+            monthly_results = {
+                month: month_result
+                for month, month_result in zip(months, results)
+                if month_result
+            }
             
             # Identify top hotspots across all months
             all_hotspots = self._consolidate_hotspots(monthly_results)
@@ -208,65 +309,67 @@ class EnhancedHotspotDetector:
             logger.error(f"Error in hotspot analysis: {e}")
             raise e
     
-    def _create_spatial_grid(self, vessel_data: Dict):
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _build_grid(min_lat: float, max_lat: float, min_lon: float, max_lon: float,
+                    resolution: float):
+        """Grid axes for the given bounds, shared across re-analyses of the same region"""
+        lats_grid = np.arange(min_lat, max_lat + resolution, resolution)
+        lons_grid = np.arange(min_lon, max_lon + resolution, resolution)
+        # Cached arrays are shared between runs, so keep them read-only
+        lats_grid.flags.writeable = False
+        lons_grid.flags.writeable = False
+        return lats_grid, lons_grid
+    
+    def _create_spatial_grid(self, vessel_arrays: VesselArrays):
         """Create spatial grid for analysis"""
-        all_vessels = vessel_data['tracked_vessels'] + vessel_data['untracked_vessels']
+        lats = vessel_arrays.lats
+        lons = vessel_arrays.lons
         
-        if not all_vessels:
+        if len(lats) == 0:
             raise ValueError("No vessel data available for grid creation")
         
         # Calculate bounds
-        lats = [v['lat'] for v in all_vessels]
-        lons = [v['lon'] for v in all_vessels]
-        
         self.bounds = {
-            'min_lat': min(lats),
-            'max_lat': max(lats),
-            'min_lon': min(lons),
-            'max_lon': max(lons)
+            'min_lat': float(lats.min()),
+            'max_lat': float(lats.max()),
+            'min_lon': float(lons.min()),
+            'max_lon': float(lons.max())
         }
         
-        # Create grid
-        lats_grid = np.arange(
-            self.bounds['min_lat'], 
-            self.bounds['max_lat'] + self.grid_resolution, 
-            self.grid_resolution
-        )
-        lons_grid = np.arange(
-            self.bounds['min_lon'], 
-            self.bounds['max_lon'] + self.grid_resolution, 
-            self.grid_resolution
+        # Snap bounds outward to the grid so nearby regions share a cache entry
+        res = self.grid_resolution
+        grid_bounds = (
+            round(float(np.floor(self.bounds['min_lat'] / res) * res), 6),
+            round(float(np.ceil(self.bounds['max_lat'] / res) * res), 6),
+            round(float(np.floor(self.bounds['min_lon'] / res) * res), 6),
+            round(float(np.ceil(self.bounds['max_lon'] / res) * res), 6),
         )
-        
-        lon_mesh, lat_mesh = np.meshgrid(lons_grid, lats_grid)
+
+        # Create grid (axes only; nothing downstream needs the full meshes)
+        lats_grid, lons_grid = self._build_grid(*grid_bounds, res)
         
         self.spatial_grid = {
             'lats': lats_grid,
             'lons': lons_grid,
-            'lat_mesh': lat_mesh,
-            'lon_mesh': lon_mesh,
-            'shape': lat_mesh.shape
+            'shape': (len(lats_grid), len(lons_grid))
         }
         
-        logger.info(f"🗺️ Created spatial grid: {lat_mesh.shape[0]}x{lat_mesh.shape[1]} points")
+        logger.info(f"🗺️ Created spatial grid: {len(lats_grid)}x{len(lons_grid)} points")
     
-    def _filter_data_by_month(self, vessel_data: Dict, month: int) -> Dict:
-        """Filter vessel data by month"""
-        tracked = []
-        untracked = []
-        
-        for vessel in vessel_data['tracked_vessels']:
-            if vessel['timestamp'] and vessel['timestamp'].month == month:
-                tracked.append(vessel)
-        
-        for vessel in vessel_data['untracked_vessels']:
-            if vessel['timestamp'] and vessel['timestamp'].month == month:
-                untracked.append(vessel)
+    def _filter_data_by_month(self, month_coords: Dict[tuple, tuple], month: int) -> Dict:
+        """Filter vessel coordinates by month"""
+        tracked = month_coords[(month, True)]
+        untracked = month_coords[(month, False)]
         
+        tracked_count = len(tracked[0])
+        untracked_count = len(untracked[0])
         return {
             'tracked_vessels': tracked,
             'untracked_vessels': untracked,
-            'total_vessels': len(tracked) + len(untracked)
+            'tracked_count': tracked_count,
+            'untracked_count': untracked_count,
+            'total_vessels': tracked_count + untracked_count
         }
     
     async def _analyze_month(self, month_data: Dict, month: int) -> Optional[Dict]:
@@ -286,8 +389,8 @@ class EnhancedHotspotDetector:
             )
             
             # Calculate density surfaces
-            tracked_density = self._calculate_density_surface(month_data['tracked_vessels'])
-            untracked_density = self._calculate_density_surface(month_data['untracked_vessels'])
+            tracked_density = self._calculate_density_surface(*month_data['tracked_vessels'])
+            untracked_density = self._calculate_density_surface(*month_data['untracked_vessels'])
             
             # Calculate risk surface
             risk_surface = self._calculate_risk_surface(
@@ -307,8 +410,8 @@ class EnhancedHotspotDetector:
                 'hotspots': hotspots,
                 'seasonal_patterns': seasonal_patterns,
                 'vessel_counts': {
-                    'tracked': len(month_data['tracked_vessels']),
-                    'untracked': len(month_data['untracked_vessels'])
+                    'tracked': month_data['tracked_count'],
+                    'untracked': month_data['untracked_count']
                 }
             }
             
@@ -316,26 +419,28 @@ class EnhancedHotspotDetector:
             logger.error(f"Error analyzing month {month}: {e}")
             return None
     
-    def _calculate_density_surface(self, vessels: List[Dict]) -> np.ndarray:
-        """Calculate kernel density surface for vessels"""
-        if not vessels:
-            return np.zeros(self.spatial_grid['shape'])
-        
-        # Extract coordinates
-        coords = np.array([[v['lat'], v['lon']] for v in vessels])
-        
-        # Create KDE
-        kde = KernelDensity(bandwidth=0.1, kernel='gaussian')
-        kde.fit(coords)
-        
-        # Evaluate on grid
-        grid_coords = np.column_stack([
-            self.spatial_grid['lat_mesh'].ravel(),
-            self.spatial_grid['lon_mesh'].ravel()
-        ])
-        
-        density = np.exp(kde.score_samples(grid_coords))
-        density = density.reshape(self.spatial_grid['shape'])
+    def _calculate_density_surface(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Calculate kernel density surface for vessel coordinate arrays"""
+        if len(lats) == 0:
+            return np.zeros(self.spatial_grid['shape'], dtype=np.float32)
+        
+        bandwidth = 0.1
+        n_cells = self.spatial_grid['shape'][0] * self.spatial_grid['shape'][1]
+        if len(lats) < DIRECT_KDE_MAX_VESSELS and n_cells < DIRECT_KDE_MAX_CELLS:
+            return _direct_gauss_kde(lats, lons, self.spatial_grid['lats'],
+                                     self.spatial_grid['lons'], bandwidth)
+        
+        # Bin vessels onto the grid (edges sit half a cell either side of each grid point)
+        half = self.grid_resolution / 2
+        lat_edges = np.append(self.spatial_grid['lats'] - half, self.spatial_grid['lats'][-1] + half)
+        lon_edges = np.append(self.spatial_grid['lons'] - half, self.spatial_grid['lons'][-1] + half)
+        counts, _, _ = np.histogram2d(lats, lons, bins=[lat_edges, lon_edges])
+        counts = counts.astype(np.float32)
+        
+        # Gaussian KDE as a separable convolution of the histogram, scaled to a
+        # probability density (per square degree) like KernelDensity.score_samples
+        density = gaussian_filter(counts, sigma=bandwidth / self.grid_resolution, mode='constant')
+        density /= len(lats) * self.grid_resolution ** 2
         
         return density
     
@@ -343,96 +448,89 @@ class EnhancedHotspotDetector:
                               untracked_density: np.ndarray, 
                               seasonal_patterns: Dict) -> np.ndarray:
         """Calculate enhanced risk surface"""
-        # Base density ratio
-        density_ratio = untracked_density / (tracked_density + 0.001)
-        
-        # Seasonal deviation factor
         expected_activity = seasonal_patterns.get('expected_activity', 0.5)
-        seasonal_deviation = np.abs(untracked_density - expected_activity) / (expected_activity + 0.001)
         
         # Isolation score
         isolation_score = self._calculate_isolation_score(untracked_density)
         
-        # Environmental context (simplified)
-        environmental_context = np.ones_like(untracked_density)  # Placeholder
-        
-        # Weighted combination
-        risk_surface = (
-            self.risk_weights['density_ratio'] * density_ratio +
-            self.risk_weights['seasonal_deviation'] * seasonal_deviation +
-            self.risk_weights['isolation_score'] * isolation_score +
-            self.risk_weights['environmental_context'] * environmental_context
-        )
-        
-        # Normalize
-        risk_surface = (risk_surface - risk_surface.min()) / (risk_surface.max() - risk_surface.min() + 0.001)
+        # Weighted combination of density ratio, seasonal deviation, isolation
+        # and (placeholder, constant) environmental context in one fused pass
+        risk_surface = _fused_risk_surface(
+            np.ascontiguousarray(untracked_density).ravel(),
+            np.ascontiguousarray(tracked_density).ravel(),
+            np.ascontiguousarray(isolation_score).ravel(),
+            float(expected_activity),
+            self.risk_weights['density_ratio'],
+            self.risk_weights['seasonal_deviation'],
+            self.risk_weights['isolation_score'],
+            self.risk_weights['environmental_context']
+        ).reshape(untracked_density.shape)
+        
+        # Normalize in place (the kernel output is a fresh array we own)
+        risk_min, risk_max = risk_surface.min(), risk_surface.max()
+        risk_surface -= risk_min
+        risk_surface /= risk_max - risk_min + 0.001
         
         return risk_surface
     
     def _calculate_isolation_score(self, density: np.ndarray) -> np.ndarray:
         """Calculate isolation score for density surface"""
         # Find local maxima
-        from scipy.ndimage import maximum_filter
-        local_maxima = (density == maximum_filter(density, size=3))
+        local_maxima = (density == maximum_filter(density, footprint=self._footprint_3x3, mode='nearest'))
         
-        # Calculate distance to nearest maximum
-        maxima_coords = np.where(local_maxima)
-        if len(maxima_coords[0]) == 0:
+        if not local_maxima.any():
             return np.zeros_like(density)
         
-        # For each grid point, calculate distance to nearest maximum
-        grid_coords = np.column_stack([
-            self.spatial_grid['lat_mesh'].ravel(),
-            self.spatial_grid['lon_mesh'].ravel()
-        ])
-        
-        maxima_points = np.column_stack([
-            self.spatial_grid['lat_mesh'][maxima_coords],
-            self.spatial_grid['lon_mesh'][maxima_coords]
-        ])
-        
-        distances = cdist(grid_coords, maxima_points)
-        min_distances = np.min(distances, axis=1)
-        min_distances = min_distances.reshape(self.spatial_grid['shape'])
+        # Distance (in degrees) from each grid point to the nearest maximum
+        min_distances = distance_transform_edt(~local_maxima).astype(np.float32)
+        min_distances *= self.grid_resolution
         
         # Convert to isolation score (higher for more isolated)
         scale = 0.1
-        isolation_score = np.exp(-min_distances / scale)
+        isolation_score = np.exp(min_distances / -scale)
         
         return isolation_score
     
     def _identify_hotspots(self, risk_surface: np.ndarray, month: int) -> List[Dict]:
         """Identify hotspot locations from risk surface"""
         # Find local maxima above threshold
-        from scipy.ndimage import maximum_filter
-        local_maxima = (risk_surface == maximum_filter(risk_surface, size=3))
+        local_maxima = (risk_surface == maximum_filter(risk_surface, footprint=self._footprint_3x3, mode='nearest'))
         
         # Apply threshold (top 5% of risk values)
-        threshold = np.percentile(risk_surface, 95)
+        # (linear-interpolated 95th percentile via introselect rather than a sort)
+        flat = risk_surface.ravel()
+        pos = 0.95 * (flat.size - 1)
+        k = int(pos)
+        k_next = min(k + 1, flat.size - 1)
+        part = np.partition(flat, (k, k_next))
+        threshold = part[k] + (pos - k) * (part[k_next] - part[k])
         hotspot_mask = local_maxima & (risk_surface > threshold)
         
-        hotspot_indices = np.where(hotspot_mask)
-        hotspots = []
+        # Build the hotspot columns in one pass, highest risk first
+        ii, jj = np.nonzero(hotspot_mask)
+        risk = risk_surface[ii, jj]
+        order = np.argsort(-risk, kind='stable')
+        ii, jj, risk = ii[order], jj[order], risk[order]
+        
+        columns = zip(
+            self.spatial_grid['lats'][ii].tolist(),
+            self.spatial_grid['lons'][jj].tolist(),
+            risk.tolist(),
+            self._calculate_relative_size(risk).tolist(),
+            np.minimum(1.0, risk * 1.2).tolist()  # Cap at 1.0
+        )
         
-        for i, j in zip(hotspot_indices[0], hotspot_indices[1]):
-            lat = self.spatial_grid['lats'][i]
-            lon = self.spatial_grid['lons'][j]
-            risk_score = risk_surface[i, j]
-            
-            hotspot = {
+        return [
+            {
                 'lat': lat,
                 'lon': lon,
-                'risk_score': float(risk_score),
+                'risk_score': risk_score,
                 'month': month,
-                'relative_size': self._calculate_relative_size(risk_score),
-                'confidence': min(1.0, risk_score * 1.2)  # Cap at 1.0
+                'relative_size': relative_size,
+                'confidence': confidence
             }
-            hotspots.append(hotspot)
-        
-        # Sort by risk score
-        hotspots.sort(key=lambda x: x['risk_score'], reverse=True)
-        
-        return hotspots
+            for lat, lon, risk_score, relative_size, confidence in columns
+        ]
     
     def _calculate_relative_size(self, risk_score: float) -> float:
         """Calculate relative size based on risk score"""
@@ -466,8 +564,8 @@ class EnhancedHotspotDetector:
             },
             'vessel_statistics': {
                 'total_vessels': vessel_data['total_vessels'],
-                'tracked_vessels': len(vessel_data['tracked_vessels']),
-                'untracked_vessels': len(vessel_data['untracked_vessels'])
+                'tracked_vessels': int(vessel_data['tracked'].sum()),
+                'untracked_vessels': int(vessel_data['total_vessels'] - vessel_data['tracked'].sum())
             },
             'hotspot_statistics': {
                 'total_hotspots': len(hotspots),
@@ -6,14 +6,18 @@ Core service for managing hotspot data, analysis, and real-time updates.
 Provides business logic for hotspot detection and risk assessment.
 """
 
-import json
 import logging
+import math
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
+import orjson
 from dataclasses import dataclass
 import asyncio
+import weakref
+from collections.abc import Sequence
+from itertools import product
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +38,59 @@ class Hotspot:
     color: Optional[str] = None
     size: Optional[float] = None
 
+# Raw hotspot fields in Hotspot constructor order (after id)
+HOTSPOT_FIELDS = (
+    'lat', 'lon', 'risk_score', 'relative_risk', 'isolation_score',
+    'month', 'tracked_density', 'untracked_density'
+)
+HOTSPOT_DTYPE = np.dtype([
+    (name, np.int16 if name == 'month' else np.float64) for name in HOTSPOT_FIELDS
+])
+
+# Display properties per risk level, lowest to highest
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+RISK_COLORS = ("#00ff00", "#ffaa00", "#ff6600", "#ff0000")
+RISK_SIZES = (0.01, 0.015, 0.02, 0.03)
+
+class _LazyHotspots(Sequence):
+    """Rank-ordered read-only view of a service's hotspots, hydrated on access."""
+    
+    def __init__(self, service: "HotspotService"):
+        self._service = service
+    
+    def __len__(self) -> int:
+        return len(self._service._rows)
+    
+    def __getitem__(self, index):
+        # range() does the bounds checks and negative/slice normalization
+        positions = range(len(self))[index]
+        if isinstance(positions, range):
+            return [self._service._hotspot(i) for i in positions]
+        return self._service._hotspot(positions)
+
 class HotspotService:
     """Core service for hotspot management and analysis."""
     
     def __init__(self, data_dir: str = "model/hotspot_analysis"):
         self.data_dir = Path(data_dir)
-        self.hotspots: List[Hotspot] = []
+        # Rank-ordered HOTSPOT_DTYPE records; Hotspot objects are only built on access
+        self._rows = np.empty(0, dtype=HOTSPOT_DTYPE)
+        self._ids = np.empty(0, dtype=np.intp)      # rank -> numeric id (file position + 1)
+        self._rank_of = np.empty(0, dtype=np.intp)  # numeric id - 1 -> rank
+        self._hotspot_cache = weakref.WeakValueDictionary()
+        self.hotspots: Sequence[Hotspot] = _LazyHotspots(self)
+        # Column (SoA) view of the records, same order, for vectorized queries
+        self._lat = np.empty(0)
+        self._lon = np.empty(0)
+        self._risk = np.empty(0)
+        self._neg_risk = np.empty(0)  # ascending, for binary searches on the risk order
+        self._month = np.empty(0, dtype=np.int16)
+        self._level = np.empty(0, dtype=np.intp)  # index into RISK_LEVELS
+        # 1°x1° cell -> rank-ordered hotspot indices, for radius queries
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {}
+        # Rank-ordered hotspot indices keyed by month and by risk level
+        self._month_rows: Dict[int, np.ndarray] = {}
+        self._level_rows: Dict[str, np.ndarray] = {}
         self.last_updated: Optional[datetime] = None
         self.risk_thresholds = {
             "CRITICAL": 80,
@@ -47,6 +98,13 @@ class HotspotService:
             "MEDIUM": 40,
             "LOW": 20
         }
+        # Risk distribution bins, fixed once: LOW counts scores below its threshold,
+        # every other level counts [threshold, next threshold)
+        self._distribution_edges = sorted(self.risk_thresholds.values())
+        self._distribution_bins = [
+            (level.lower(), 0 if level == "LOW" else self._distribution_edges.index(threshold) + 1)
+            for level, threshold in self.risk_thresholds.items()
+        ]
         self.load_data()
     
     def load_data(self) -> bool:
@@ -57,34 +115,28 @@ class HotspotService:
                 logger.warning(f"Hotspot data file not found: {hotspots_file}")
                 return False
             
-            with open(hotspots_file, 'r') as f:
-                raw_hotspots = json.load(f)
+            raw_hotspots = orjson.loads(hotspots_file.read_bytes())
             
-            # Convert to Hotspot objects
-            self.hotspots = []
-            for i, raw_hotspot in enumerate(raw_hotspots):
-                hotspot = Hotspot(
-                    id=f"hotspot_{i+1}",
-                    lat=raw_hotspot.get('lat', 0),
-                    lon=raw_hotspot.get('lon', 0),
-                    risk_score=raw_hotspot.get('risk_score', 0),
-                    relative_risk=raw_hotspot.get('relative_risk', 0),
-                    isolation_score=raw_hotspot.get('isolation_score', 0),
-                    month=raw_hotspot.get('month', 0),
-                    tracked_density=raw_hotspot.get('tracked_density', 0),
-                    untracked_density=raw_hotspot.get('untracked_density', 0)
-                )
-                
-                # Calculate derived properties
-                self._calculate_hotspot_properties(hotspot)
-                self.hotspots.append(hotspot)
+            # Parse every row into one structured array, then rank by risk score
+            rows = np.fromiter(
+                (tuple(raw_hotspot.get(name, 0) for name in HOTSPOT_FIELDS) for raw_hotspot in raw_hotspots),
+                dtype=HOTSPOT_DTYPE, count=len(raw_hotspots)
+            )
+            order = np.argsort(-rows['risk_score'], kind='stable')
+            rows = rows[order]
             
-            # Sort by risk score
-            self.hotspots.sort(key=lambda x: x.risk_score, reverse=True)
+            # Ids keep the file position, ranks follow risk
+            self._rows = rows
+            self._ids = order + 1
+            self._rank_of = np.empty_like(order)
+            self._rank_of[order] = np.arange(len(order))
+            self._hotspot_cache = weakref.WeakValueDictionary()
             
-            # Assign ranks
-            for i, hotspot in enumerate(self.hotspots):
-                hotspot.rank = i + 1
+            self._build_columns(rows)
+            # Derived properties: bin every score against the level thresholds at once
+            self._level = np.digitize(self._risk, self._level_edges())
+            self._build_indexes()
+            self._build_grid()
             
             self.last_updated = datetime.now()
             logger.info(f"Loaded {len(self.hotspots)} hotspots")
@@ -94,82 +146,118 @@ class HotspotService:
             logger.error(f"Error loading hotspot data: {e}")
             return False
     
-    def _calculate_hotspot_properties(self, hotspot: Hotspot):
-        """Calculate derived properties for a hotspot."""
-        # Determine risk level
-        if hotspot.risk_score >= self.risk_thresholds["CRITICAL"]:
-            hotspot.risk_level = "CRITICAL"
-            hotspot.color = "#ff0000"
-            hotspot.size = 0.03
-        elif hotspot.risk_score >= self.risk_thresholds["HIGH"]:
-            hotspot.risk_level = "HIGH"
-            hotspot.color = "#ff6600"
-            hotspot.size = 0.02
-        elif hotspot.risk_score >= self.risk_thresholds["MEDIUM"]:
-            hotspot.risk_level = "MEDIUM"
-            hotspot.color = "#ffaa00"
-            hotspot.size = 0.015
-        else:
-            hotspot.risk_level = "LOW"
-            hotspot.color = "#00ff00"
-            hotspot.size = 0.01
+    def _build_columns(self, rows: np.ndarray):
+        """Keep the rank-ordered columns used by the filter and statistics methods."""
+        self._lat = np.ascontiguousarray(rows['lat'])
+        self._lon = np.ascontiguousarray(rows['lon'])
+        self._risk = np.ascontiguousarray(rows['risk_score'])
+        self._neg_risk = -self._risk
+        self._month = np.ascontiguousarray(rows['month'])
+    
+    def _build_indexes(self):
+        """Group hotspot indices by month and risk level."""
+        self._month_rows = self._group_rows(self._month)
+        self._level_rows = {
+            RISK_LEVELS[level]: rows for level, rows in self._group_rows(self._level).items()
+        }
+    
+    @staticmethod
+    def _group_rows(keys: np.ndarray) -> Dict[int, np.ndarray]:
+        """Rank-ordered row indices per key, from one stable sort on the key column."""
+        order = np.argsort(keys, kind='stable')
+        values, starts = np.unique(keys[order], return_index=True)
+        return dict(zip(values.tolist(), np.split(order, starts[1:])))
+    
+    def _build_grid(self):
+        """Bucket hotspot indices into 1°x1° lat/lon cells."""
+        self._grid = {}
+        if not len(self._lat):
+            return
+        bins = np.column_stack((np.floor(self._lat), np.floor(self._lon))).astype(np.int64)
+        cells, cell_of = np.unique(bins, axis=0, return_inverse=True)
+        cell_of = cell_of.ravel()
+        members = np.split(np.argsort(cell_of, kind='stable'), np.cumsum(np.bincount(cell_of))[:-1])
+        for (lat_bin, lon_bin), indices in zip(cells.tolist(), members):
+            self._grid[(lat_bin, lon_bin)] = indices
+    
+    def _hotspot(self, index: int) -> Hotspot:
+        """Hotspot at a rank index, built from its record on first use."""
+        hotspot = self._hotspot_cache.get(index)
+        if hotspot is None:
+            level = self._level[index]
+            hotspot = Hotspot(
+                self._hotspot_id(index), *self._rows[index].tolist(), rank=index + 1,
+                risk_level=RISK_LEVELS[level], color=RISK_COLORS[level], size=RISK_SIZES[level]
+            )
+            self._hotspot_cache[index] = hotspot
+        return hotspot
+    
+    def _hotspot_id(self, index: int) -> str:
+        return f"hotspot_{self._ids[index]}"
+    
+    def _select(self, mask: np.ndarray) -> List[Hotspot]:
+        """Hotspots where mask is set, in rank order."""
+        return [self._hotspot(i) for i in np.flatnonzero(mask)]
+    
+    def _level_edges(self) -> List[float]:
+        """Score edges where MEDIUM, HIGH and CRITICAL begin (index into RISK_LEVELS)."""
+        return [self.risk_thresholds[level] for level in RISK_LEVELS[1:]]
+    
+    def _top_rows(self, limit: int, min_risk: float) -> range:
+        """Rank indices of the top `limit` hotspots scoring at least min_risk."""
+        # Rows are sorted by risk, so the matches are a prefix found by binary search
+        count = int(np.searchsorted(self._neg_risk, -min_risk, side='right'))
+        return range(count)[:limit]
     
     def get_top_hotspots(self, limit: int = 5, min_risk: float = 0) -> List[Hotspot]:
         """Get top hotspots with optional filtering."""
-        filtered_hotspots = [
-            h for h in self.hotspots 
-            if h.risk_score >= min_risk
-        ]
-        return filtered_hotspots[:limit]
+        return [self._hotspot(i) for i in self._top_rows(limit, min_risk)]
     
     def get_hotspots_by_region(self, min_lat: float, max_lat: float, 
                               min_lon: float, max_lon: float) -> List[Hotspot]:
         """Get hotspots within a geographic region."""
-        return [
-            h for h in self.hotspots
-            if (min_lat <= h.lat <= max_lat and 
-                min_lon <= h.lon <= max_lon)
-        ]
+        return self._select(
+            (self._lat >= min_lat) & (self._lat <= max_lat) &
+            (self._lon >= min_lon) & (self._lon <= max_lon)
+        )
     
     def get_hotspots_by_month(self, month: int) -> List[Hotspot]:
         """Get hotspots for a specific month."""
-        return [h for h in self.hotspots if h.month == month]
+        return [self._hotspot(i) for i in self._month_rows.get(month, ())]
     
     def get_hotspots_by_risk_level(self, risk_level: str) -> List[Hotspot]:
         """Get hotspots by risk level."""
-        return [h for h in self.hotspots if h.risk_level == risk_level.upper()]
+        return [self._hotspot(i) for i in self._level_rows.get(risk_level.upper(), ())]
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get comprehensive statistics."""
-        if not self.hotspots:
+        if not len(self._rows):
             return {}
         
-        risk_scores = [h.risk_score for h in self.hotspots]
+        risk_scores = self._risk
         
         # Calculate risk distribution
-        risk_distribution = {}
-        for level, threshold in self.risk_thresholds.items():
-            if level == "LOW":
-                count = len([r for r in risk_scores if r < threshold])
-            else:
-                next_threshold = min([t for t in self.risk_thresholds.values() if t > threshold], default=float('inf'))
-                count = len([r for r in risk_scores if threshold <= r < next_threshold])
-            risk_distribution[level.lower()] = count
+        bin_counts = np.bincount(
+            np.digitize(risk_scores, self._distribution_edges),
+            minlength=len(self._distribution_edges) + 1
+        )
+        risk_distribution = {label: int(bin_counts[b]) for label, b in self._distribution_bins}
         
-        # Monthly breakdown
+        # Monthly breakdown (rows are rank-ordered, so the first is the month's top hotspot)
         monthly_stats = {}
         for month in range(1, 6):
-            month_hotspots = self.get_hotspots_by_month(month)
-            if month_hotspots:
+            rows = self._month_rows.get(month)
+            if rows is not None:
+                month_risk = self._risk[rows]
                 monthly_stats[month] = {
-                    "count": len(month_hotspots),
-                    "avg_risk": sum(h.risk_score for h in month_hotspots) / len(month_hotspots),
-                    "max_risk": max(h.risk_score for h in month_hotspots),
-                    "top_hotspot": max(month_hotspots, key=lambda x: x.risk_score).id
+                    "count": len(rows),
+                    "avg_risk": float(month_risk.mean()),
+                    "max_risk": float(month_risk[0]),
+                    "top_hotspot": self._hotspot_id(rows[0])
                 }
         
         return {
-            "total_hotspots": len(self.hotspots),
+            "total_hotspots": len(self._rows),
             "average_risk": np.mean(risk_scores),
             "max_risk": np.max(risk_scores),
             "min_risk": np.min(risk_scores),
@@ -180,37 +268,42 @@ class HotspotService:
     
     def get_globe_integration_data(self) -> Dict[str, Any]:
         """Get data formatted for Three.js globe integration."""
-        top_hotspots = self.get_top_hotspots(limit=5)
+        # Same top 5 as get_top_hotspots(limit=5), read straight from the records
+        top = np.array(self._top_rows(5, 0), dtype=np.intp)
         
         return {
             "hotspots": [
                 {
-                    "id": hotspot.id,
-                    "rank": hotspot.rank,
+                    "id": self._hotspot_id(index),
+                    "rank": index + 1,
                     "position": {
-                        "lat": hotspot.lat,
-                        "lon": hotspot.lon
+                        "lat": row['lat'],
+                        "lon": row['lon']
                     },
                     "risk": {
-                        "score": hotspot.risk_score,
-                        "level": hotspot.risk_level,
-                        "color": hotspot.color,
-                        "size": hotspot.size
+                        "score": row['risk_score'],
+                        "level": RISK_LEVELS[level],
+                        "color": RISK_COLORS[level],
+                        "size": RISK_SIZES[level]
                     },
                     "metadata": {
-                        "month": hotspot.month,
-                        "relative_risk": hotspot.relative_risk,
-                        "isolation_score": hotspot.isolation_score,
-                        "tracked_density": hotspot.tracked_density,
-                        "untracked_density": hotspot.untracked_density
+                        "month": row['month'],
+                        "relative_risk": row['relative_risk'],
+                        "isolation_score": row['isolation_score'],
+                        "tracked_density": row['tracked_density'],
+                        "untracked_density": row['untracked_density']
                     },
-                    "name": f"{hotspot.risk_level} Risk Hotspot #{hotspot.rank}",
-                    "description": f"Risk Score: {hotspot.risk_score:.1f} | Month: {hotspot.month}"
+                    "name": f"{RISK_LEVELS[level]} Risk Hotspot #{index + 1}",
+                    "description": f"Risk Score: {row['risk_score']:.1f} | Month: {row['month']}"
                 }
-                for hotspot in top_hotspots
+                for index, row, level in zip(
+                    top.tolist(),
+                    (dict(zip(HOTSPOT_FIELDS, values)) for values in self._rows[top].tolist()),
+                    self._level[top].tolist()
+                )
             ],
             "metadata": {
-                "total_hotspots": len(self.hotspots),
+                "total_hotspots": len(self._rows),
                 "last_updated": self.last_updated.isoformat() if self.last_updated else None,
                 "data_source": "Global Fishing Watch SAR Analysis",
                 "analysis_period": "5 months (April-September 2025)"
@@ -220,64 +313,62 @@ class HotspotService:
     def search_hotspots(self, query: str) -> List[Hotspot]:
         """Search hotspots by various criteria."""
         query_lower = query.lower()
-        results = []
         
-        for hotspot in self.hotspots:
-            # Search by risk level
-            if query_lower in hotspot.risk_level.lower():
-                results.append(hotspot)
-                continue
-            
-            # Search by month
-            if query_lower in f"month {hotspot.month}":
-                results.append(hotspot)
-                continue
-            
-            # Search by coordinates (approximate)
-            if any(char.isdigit() for char in query):
-                try:
-                    # Try to parse as coordinates
-                    if ',' in query:
-                        lat_str, lon_str = query.split(',')
-                        lat, lon = float(lat_str.strip()), float(lon_str.strip())
-                        if abs(hotspot.lat - lat) < 1 and abs(hotspot.lon - lon) < 1:
-                            results.append(hotspot)
-                except:
-                    pass
+        # Search by risk level
+        levels = [i for i, level in enumerate(RISK_LEVELS) if query_lower in level.lower()]
+        matches = np.isin(self._level, levels)
         
-        return results
+        # Search by month
+        months = [m for m in np.unique(self._month).tolist() if query_lower in f"month {m}"]
+        matches |= np.isin(self._month, months)
+        
+        # Search by coordinates (approximate); the query is parsed once, not per hotspot
+        if any(char.isdigit() for char in query) and ',' in query:
+            try:
+                lat_str, lon_str = query.split(',')
+                lat, lon = float(lat_str.strip()), float(lon_str.strip())
+                matches |= (np.abs(self._lat - lat) < 1) & (np.abs(self._lon - lon) < 1)
+            except ValueError:
+                pass
+        
+        return self._select(matches)
     
     def get_risk_trends(self) -> Dict[str, Any]:
         """Get risk trends over time."""
         monthly_data = {}
+        # Months are visited in order, so the first and last averages fall out of the loop
+        first_month_avg = last_month_avg = None
         
         for month in range(1, 6):
-            month_hotspots = self.get_hotspots_by_month(month)
-            if month_hotspots:
+            rows = self._month_rows.get(month)
+            if rows is not None:
+                month_risk = self._risk[rows]
+                level_counts = np.bincount(self._level[rows], minlength=len(RISK_LEVELS)).tolist()
                 monthly_data[month] = {
-                    "count": len(month_hotspots),
-                    "avg_risk": np.mean([h.risk_score for h in month_hotspots]),
-                    "max_risk": max([h.risk_score for h in month_hotspots]),
+                    "count": len(rows),
+                    "avg_risk": month_risk.mean(),
+                    "max_risk": float(month_risk[0]),
                     "risk_levels": {
-                        level: len([h for h in month_hotspots if h.risk_level == level])
+                        level: level_counts[RISK_LEVELS.index(level)]
                         for level in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
                     }
                 }
+                if first_month_avg is None:
+                    first_month_avg = monthly_data[month]["avg_risk"]
+                else:
+                    last_month_avg = monthly_data[month]["avg_risk"]
         
         return {
             "monthly_trends": monthly_data,
-            "overall_trend": self._calculate_overall_trend(monthly_data)
+            "overall_trend": self._calculate_overall_trend(first_month_avg, last_month_avg)
         }
     
-    def _calculate_overall_trend(self, monthly_data: Dict) -> str:
-        """Calculate overall risk trend."""
-        if len(monthly_data) < 2:
+    def _calculate_overall_trend(self, first_month_avg: Optional[float],
+                                 last_month_avg: Optional[float]) -> str:
+        """Calculate overall risk trend from the first and last months with data."""
+        if first_month_avg is None or last_month_avg is None:
             return "insufficient_data"
         
-        months = sorted(monthly_data.keys())
-        first_month_avg = monthly_data[months[0]]["avg_risk"]
-        last_month_avg = monthly_data[months[-1]]["avg_risk"]
-        
         if last_month_avg > first_month_avg * 1.1:
             return "increasing"
         elif last_month_avg < first_month_avg * 0.9:
@@ -291,20 +382,45 @@ class HotspotService:
     
     def get_hotspot_by_id(self, hotspot_id: str) -> Optional[Hotspot]:
         """Get a specific hotspot by ID."""
-        for hotspot in self.hotspots:
-            if hotspot.id == hotspot_id:
-                return hotspot
-        return None
+        # Ids are "hotspot_<file position + 1>"; anything that doesn't round-trip is unknown
+        prefix, _, number = hotspot_id.partition("_")
+        if prefix != "hotspot" or not number.isdigit() or str(int(number)) != number:
+            return None
+        position = int(number) - 1
+        if not 0 <= position < len(self._rank_of):
+            return None
+        return self._hotspot(int(self._rank_of[position]))
     
     def get_nearby_hotspots(self, lat: float, lon: float, radius: float = 1.0) -> List[Hotspot]:
         """Get hotspots within a radius of a given point."""
-        nearby = []
-        for hotspot in self.hotspots:
-            # Simple distance calculation (not accurate for large distances)
-            distance = np.sqrt((hotspot.lat - lat)**2 + (hotspot.lon - lon)**2)
-            if distance <= radius:
-                nearby.append(hotspot)
-        return nearby
+        # Only cells overlapping the query square can hold matches; fall back to
+        # a full scan when the square covers more cells than are populated
+        lat_bins = range(math.floor(lat - radius), math.floor(lat + radius) + 1)
+        lon_bins = range(math.floor(lon - radius), math.floor(lon + radius) + 1)
+        if len(lat_bins) * len(lon_bins) > len(self._grid):
+            candidates = np.arange(len(self._lat))
+        else:
+            buckets = [self._grid[cell] for cell in product(lat_bins, lon_bins) if cell in self._grid]
+            if not buckets:
+                return []
+            candidates = np.sort(np.concatenate(buckets))
+        
+        # Simple distance calculation (not accurate for large distances)
+        distance_sq = (self._lat[candidates] - lat) ** 2 + (self._lon[candidates] - lon) ** 2
+        return [self._hotspot(i) for i in candidates[distance_sq <= radius ** 2]]
+
+# Global service instance, created on first use so importing this module does no file I/O
+_hotspot_service: Optional[HotspotService] = None
+
+def get_hotspot_service() -> HotspotService:
+    """Shared HotspotService, loaded on first call."""
+    global _hotspot_service
+    if _hotspot_service is None:
+        _hotspot_service = HotspotService()
+    return _hotspot_service
 
-# Global service instance
-hotspot_service = HotspotService()
+def __getattr__(name: str):
+    # Keeps `from services.hotspot_service import hotspot_service` working
+    if name == "hotspot_service":
+        return get_hotspot_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -17,14 +17,40 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import json
 
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
 # Import MongoDB functions
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from api_routes.mongodb import getVesselDataForHotspotAnalysis
+from api_routes.mongodb import getVesselColumnsForHotspotAnalysis
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371
+
+RISK_COLORS = {
+    "CRITICAL": "#ff0000",
+    "HIGH": "#ff6600",
+    "MEDIUM": "#ffaa00",
+    "LOW": "#00ff00"
+}
+
+def _unit_xyz(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Unit-sphere xyz for lat/lon degrees; a great-circle radius r is then a chord of 2*sin(r/2R)
+    """
+    lat_rad = np.radians(lats)
+    lon_rad = np.radians(lons)
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+def _chord_length(radius_km: float) -> float:
+    return 2 * math.sin(radius_km / (2 * EARTH_RADIUS_KM))
+
 @dataclass
 class SimpleHotspot:
     """Simplified hotspot data structure for frontend"""
@@ -58,133 +84,142 @@ class SimpleHotspotDetector:
         self.min_vessels = 3  # Minimum vessels to form a hotspot
         self.max_hotspots = 100  # Limit total hotspots
         
+        # Detection results per (start_date, end_date), reused for cache_ttl
+        self.cache_ttl = timedelta(seconds=60)
+        self._cache: Dict[Tuple[Optional[datetime], Optional[datetime]], Tuple[datetime, List[SimpleHotspot]]] = {}
+        
     def detect_hotspots(self, start_date: datetime = None, end_date: datetime = None) -> List[SimpleHotspot]:
         """
         Main hotspot detection function
+        
+        Results are cached for `cache_ttl`, so the region, risk-level and
+        statistics helpers share one MongoDB fetch and clustering run.
         """
+        key = (start_date, end_date)
+        now = datetime.utcnow()
+        cached = self._cache.get(key)
+        if cached and now - cached[0] < self.cache_ttl:
+            return list(cached[1])
+        
         try:
-            logger.info("🔍 Starting simple hotspot detection...")
-            
-            # Get vessel data from MongoDB
-            vessel_data = getVesselDataForHotspotAnalysis(start_date, end_date)
-            
-            if vessel_data['total_vessels'] == 0:
-                logger.warning("No vessel data available for hotspot detection")
-                return []
-            
-            logger.info(f"📊 Processing {vessel_data['total_vessels']} vessels")
-            
-            # Separate tracked and untracked vessels
-            tracked_vessels = vessel_data['tracked_vessels']
-            untracked_vessels = vessel_data['untracked_vessels']
-            
-            # Find clusters of untracked vessels
-            untracked_clusters = self._find_clusters(untracked_vessels)
-            
-            # Find clusters of tracked vessels for comparison
-            tracked_clusters = self._find_clusters(tracked_vessels)
-            
-            # Calculate hotspots based on untracked vessel clusters
-            hotspots = self._calculate_hotspots(untracked_clusters, tracked_clusters)
-            
-            # Sort by risk score and limit
-            hotspots.sort(key=lambda x: x.risk_score, reverse=True)
-            hotspots = hotspots[:self.max_hotspots]
-            
-            logger.info(f"🎯 Detected {len(hotspots)} hotspots")
-            return hotspots
-            
+            hotspots = self._run_detection(start_date, end_date)
         except Exception as e:
             logger.error(f"Error in hotspot detection: {e}")
             return []
+        
+        # Drop expired entries so date-range keys don't accumulate
+        self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+        self._cache[key] = (now, hotspots)
+        return list(hotspots)
     
-    def _find_clusters(self, vessels: List[Dict]) -> List[Dict]:
+    def invalidate_cache(self):
         """
-        Find clusters of vessels using simple distance-based clustering
+        Forget cached detection results (e.g. after new vessel data is stored)
         """
-        if not vessels:
+        self._cache.clear()
+    
+    def _run_detection(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> List[SimpleHotspot]:
+        """
+        Fetch vessels from MongoDB and cluster them into hotspots
+        """
+        logger.info("🔍 Starting simple hotspot detection...")
+        
+        # Get vessel coordinates from MongoDB as lat/lon arrays per group
+        vessel_data = getVesselColumnsForHotspotAnalysis(start_date, end_date)
+        
+        if vessel_data['total_vessels'] == 0:
+            logger.warning("No vessel data available for hotspot detection")
             return []
         
-        clusters = []
-        processed = set()
-        
-        for i, vessel in enumerate(vessels):
-            if i in processed:
-                continue
-                
-            # Start new cluster
-            cluster = {
-                'vessels': [vessel],
-                'center_lat': vessel['lat'],
-                'center_lon': vessel['lon'],
-                'bounds': {
-                    'min_lat': vessel['lat'],
-                    'max_lat': vessel['lat'],
-                    'min_lon': vessel['lon'],
-                    'max_lon': vessel['lon']
-                }
-            }
-            processed.add(i)
-            
-            # Find nearby vessels
-            for j, other_vessel in enumerate(vessels):
-                if j in processed or i == j:
-                    continue
-                    
-                distance = self._calculate_distance(
-                    vessel['lat'], vessel['lon'],
-                    other_vessel['lat'], other_vessel['lon']
-                )
-                
-                if distance <= self.cluster_radius_km:
-                    cluster['vessels'].append(other_vessel)
-                    processed.add(j)
-                    
-                    # Update cluster bounds
-                    cluster['bounds']['min_lat'] = min(cluster['bounds']['min_lat'], other_vessel['lat'])
-                    cluster['bounds']['max_lat'] = max(cluster['bounds']['max_lat'], other_vessel['lat'])
-                    cluster['bounds']['min_lon'] = min(cluster['bounds']['min_lon'], other_vessel['lon'])
-                    cluster['bounds']['max_lon'] = max(cluster['bounds']['max_lon'], other_vessel['lon'])
-            
-            # Calculate cluster center
-            if len(cluster['vessels']) >= self.min_vessels:
-                cluster['center_lat'] = sum(v['lat'] for v in cluster['vessels']) / len(cluster['vessels'])
-                cluster['center_lon'] = sum(v['lon'] for v in cluster['vessels']) / len(cluster['vessels'])
-                clusters.append(cluster)
+        logger.info(f"📊 Processing {vessel_data['total_vessels']} vessels")
         
-        return clusters
+        # Separate tracked and untracked vessels
+        tracked = vessel_data['tracked']
+        untracked = vessel_data['untracked']
+        
+        # Find clusters of untracked vessels
+        untracked_clusters = self._find_clusters(untracked['lat'], untracked['lon'])
+        
+        # Find clusters of tracked vessels for comparison
+        tracked_clusters = self._find_clusters(tracked['lat'], tracked['lon'])
+        
+        # Calculate hotspots based on untracked vessel clusters
+        hotspots = self._calculate_hotspots(untracked_clusters, tracked_clusters)
+        
+        # Sort by risk score and limit
+        hotspots.sort(key=lambda x: x.risk_score, reverse=True)
+        hotspots = hotspots[:self.max_hotspots]
+        
+        logger.info(f"🎯 Detected {len(hotspots)} hotspots")
+        return hotspots
     
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    def _find_clusters(self, lats: np.ndarray, lons: np.ndarray) -> List[Dict]:
         """
-        Calculate distance between two points in kilometers using Haversine formula
+        Find clusters of vessels using simple distance-based clustering
+        
+        Vessels within `cluster_radius_km` of each other are linked, and
+        clusters are the connected components of that neighbor graph. A
+        cluster's 'vessels' entry holds its member indices into lats/lons.
         """
-        R = 6371  # Earth's radius in kilometers
+        n = len(lats)
+        if n == 0:
+            return []
+        
+        # On the unit sphere a great-circle radius is a fixed chord length,
+        # so a plain KD-tree over xyz finds every pair within the radius
+        xyz = _unit_xyz(lats, lons)
+        pairs = cKDTree(xyz).query_pairs(_chord_length(self.cluster_radius_km), output_type='ndarray')
+        
+        graph = csr_matrix(
+            (np.ones(len(pairs), dtype=bool), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+        )
+        n_clusters, labels = connected_components(graph, directed=False)
         
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        # Per-cluster counts, centers and bounds in one pass each
+        counts = np.bincount(labels, minlength=n_clusters)
+        center_lat = np.bincount(labels, weights=lats, minlength=n_clusters) / counts
+        center_lon = np.bincount(labels, weights=lons, minlength=n_clusters) / counts
+        min_lat = np.full(n_clusters, np.inf)
+        max_lat = np.full(n_clusters, -np.inf)
+        min_lon = np.full(n_clusters, np.inf)
+        max_lon = np.full(n_clusters, -np.inf)
+        np.minimum.at(min_lat, labels, lats)
+        np.maximum.at(max_lat, labels, lats)
+        np.minimum.at(min_lon, labels, lons)
+        np.maximum.at(max_lon, labels, lons)
+        members = np.split(np.argsort(labels, kind='stable'), np.cumsum(counts)[:-1])
         
-        a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(dlon/2) * math.sin(dlon/2))
+        # Only keep clusters with minimum vessel count
+        clusters = []
+        for k in np.flatnonzero(counts >= self.min_vessels):
+            clusters.append({
+                'vessels': members[k],
+                'center_lat': float(center_lat[k]),
+                'center_lon': float(center_lon[k]),
+                'bounds': {
+                    'min_lat': float(min_lat[k]),
+                    'max_lat': float(max_lat[k]),
+                    'min_lon': float(min_lon[k]),
+                    'max_lon': float(max_lon[k])
+                }
+            })
         
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
+        return clusters
     
     def _calculate_hotspots(self, untracked_clusters: List[Dict], tracked_clusters: List[Dict]) -> List[SimpleHotspot]:
         """
         Calculate hotspot risk scores based on untracked vs tracked vessel clusters
         """
         hotspots = []
+        created_at = datetime.utcnow()  # one timestamp for the whole detection run
         
-        for i, untracked_cluster in enumerate(untracked_clusters):
+        # Nearby tracked clusters for every untracked cluster in one pass
+        nearby_by_cluster = self._find_nearby_tracked_clusters(untracked_clusters, tracked_clusters)
+        
+        for i, (untracked_cluster, nearby_tracked) in enumerate(zip(untracked_clusters, nearby_by_cluster)):
             # Count vessels in cluster
             vessel_count = len(untracked_cluster['vessels'])
             
-            # Find nearby tracked clusters for comparison
-            nearby_tracked = self._find_nearby_tracked_clusters(
-                untracked_cluster, tracked_clusters
-            )
-            
             # Calculate risk score
             risk_score = self._calculate_risk_score(
                 untracked_cluster, nearby_tracked
@@ -208,30 +243,35 @@ class SimpleHotspotDetector:
                 untracked_ratio=untracked_ratio,
                 size=self._calculate_size(risk_score),
                 color=self._get_risk_color(risk_level),
-                created_at=datetime.utcnow()
+                created_at=created_at
             )
             
             hotspots.append(hotspot)
         
         return hotspots
     
-    def _find_nearby_tracked_clusters(self, untracked_cluster: Dict, tracked_clusters: List[Dict]) -> List[Dict]:
+    def _find_nearby_tracked_clusters(self, untracked_clusters: List[Dict],
+                                      tracked_clusters: List[Dict]) -> List[List[Dict]]:
         """
-        Find tracked vessel clusters near an untracked cluster
+        Find tracked vessel clusters near each untracked cluster
         """
-        nearby = []
         search_radius = self.cluster_radius_km * 2  # Search in larger radius
+        if not untracked_clusters or not tracked_clusters:
+            return [[] for _ in untracked_clusters]
         
-        for tracked_cluster in tracked_clusters:
-            distance = self._calculate_distance(
-                untracked_cluster['center_lat'], untracked_cluster['center_lon'],
-                tracked_cluster['center_lat'], tracked_cluster['center_lon']
-            )
-            
-            if distance <= search_radius:
-                nearby.append(tracked_cluster)
+        def center_xyz(clusters: List[Dict]) -> np.ndarray:
+            n = len(clusters)
+            lats = np.fromiter((c['center_lat'] for c in clusters), dtype=np.float64, count=n)
+            lons = np.fromiter((c['center_lon'] for c in clusters), dtype=np.float64, count=n)
+            return _unit_xyz(lats, lons)
+        
+        # One tree over the tracked centers, queried for all untracked centers at once
+        tracked_tree = cKDTree(center_xyz(tracked_clusters))
+        nearby = tracked_tree.query_ball_point(
+            center_xyz(untracked_clusters), _chord_length(search_radius), return_sorted=True
+        )
         
-        return nearby
+        return [[tracked_clusters[j] for j in indices] for indices in nearby]
     
     def _calculate_risk_score(self, untracked_cluster: Dict, nearby_tracked: List[Dict]) -> float:
         """
@@ -298,13 +338,7 @@ class SimpleHotspotDetector:
         """
         Get color for risk level
         """
-        colors = {
-            "CRITICAL": "#ff0000",
-            "HIGH": "#ff6600", 
-            "MEDIUM": "#ffaa00",
-            "LOW": "#00ff00"
-        }
-        return colors.get(risk_level, "#00ff00")
+        return RISK_COLORS.get(risk_level, "#00ff00")
     
     def get_hotspots_by_region(self, min_lat: float, max_lat: float, 
                               min_lon: float, max_lon: float) -> List[SimpleHotspot]:
@@ -362,5 +396,20 @@ class SimpleHotspotDetector:
             "last_updated": datetime.utcnow().isoformat()
         }
 
-# Global detector instance
-simple_hotspot_detector = SimpleHotspotDetector()
+# Global detector instance, created on first use
+_simple_hotspot_detector: Optional[SimpleHotspotDetector] = None
+
+def get_simple_hotspot_detector() -> SimpleHotspotDetector:
+    """
+    Shared SimpleHotspotDetector (and its result cache), created on first call
+    """
+    global _simple_hotspot_detector
+    if _simple_hotspot_detector is None:
+        _simple_hotspot_detector = SimpleHotspotDetector()
+    return _simple_hotspot_detector
+
+def __getattr__(name: str):
+    # Keeps `from services.simple_hotspot_detector import simple_hotspot_detector` working
+    if name == "simple_hotspot_detector":
+        return get_simple_hotspot_detector()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
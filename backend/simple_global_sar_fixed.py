@@ -8,10 +8,73 @@ from dotenv import load_dotenv
 load_dotenv(".env")
 
 import os
+import gzip
 import requests
-import json
+import ijson
+import orjson
 from datetime import datetime, timedelta
 
+class TeeReader:
+    """File-like reader that copies every chunk it reads from src into sink"""
+    def __init__(self, src, sink):
+        self.src = src
+        self.sink = sink
+    
+    def read(self, size=-1):
+        chunk = self.src.read(size)
+        self.sink.write(chunk)
+        return chunk
+
+# Report dataset key prefix (we only request public-global-sar-presence)
+SAR_DATASET_PREFIX = "public-global-sar-presence"
+
+def process_entries(entries):
+    """
+    Flatten the SAR vessel records of every report entry
+    
+    Returns (vessels, vessels_with_mmsi, west_count); every count is
+    accumulated in this one pass. A vessel with an MMSI is a matched vessel.
+    """
+    vessels = []
+    append = vessels.append
+    vessels_with_mmsi = 0
+    west_count = 0
+    
+    for entry in entries:
+        for dataset_name, dataset_entries in entry.items():
+            if not dataset_entries or not dataset_name.startswith(SAR_DATASET_PREFIX):
+                continue
+            for vessel_data in dataset_entries:
+                get = vessel_data.get
+                
+                # Check if vessel has MMSI (matched)
+                mmsi = get("mmsi", "")
+                has_mmsi = bool(mmsi)
+                if has_mmsi:
+                    vessels_with_mmsi += 1
+                
+                lon = get("lon", 0)
+                if lon < 0:
+                    west_count += 1
+                
+                # Extract vessel metadata
+                append({
+                    "vessel_id": get("vessel_id", ""),
+                    "mmsi": mmsi,
+                    "ship_name": get("shipName", ""),
+                    "flag": get("flag", ""),
+                    "vessel_type": get("vessel_type", ""),
+                    "lat": get("lat", 0),
+                    "lon": lon,
+                    "detections": get("detections", 0),
+                    "date": get("date", ""),
+                    "matched": has_mmsi,
+                    # Full entry: mongostoredata builds positionDoc from raw_data
+                    "raw_data": vessel_data
+                })
+    
+    return vessels, vessels_with_mmsi, west_count
+
 # API Configuration
 url = "https://gateway.api.globalfishingwatch.org/v3/4wings/report"
 
@@ -34,9 +97,14 @@ api_key = os.getenv('GFW_API_KEY')
 
 headers = {
     "Authorization": f"Bearer {api_key}",
-    "Content-Type": "application/json"
+    "Content-Type": "application/json",
+    "Accept-Encoding": "gzip"  # the global report is multi-MB JSON
 }
 
+# Keep-alive session, so repeated/scheduled requests reuse the connection
+session = requests.Session()
+session.headers.update(headers)
+
 # Global GeoJSON polygon (entire world - both hemispheres)
 data = {
     "geojson": {
@@ -56,54 +124,25 @@ print(f"📡 Using global GeoJSON polygon (both hemispheres)")
 
 # Make API request
 try:
-    response = requests.post(url, headers=headers, params=params, json=data)
+    response = session.post(url, params=params, json=data, stream=True, timeout=(10, 120))
     
     if response.status_code == 200:
-        raw_data = response.json()
-        
-        # Save raw response
-        with open('raw_response_global.json', 'w') as f:
-            json.dump(raw_data, f, indent=2)
-        print("✅ Raw response saved to raw_response_global.json")
-        
-        # Process vessel data
-        vessels = []
-        total_vessels = 0
-        matched_vessels = 0
-        vessels_with_mmsi = 0
+        # Parse entries straight off the socket; the raw bytes are archived as
+        # they stream past instead of being loaded whole and re-serialized
+        response.raw.decode_content = True
+        with gzip.open('raw_response_global.json.gz', 'wb') as raw_file:
+            entries = ijson.items(TeeReader(response.raw, raw_file), 'entries.item', use_float=True)
+            
+            # Process vessel data
+            vessels, vessels_with_mmsi, west_count = process_entries(entries)
+            total_vessels = len(vessels)
+            east_count = total_vessels - west_count
         
-        for entry in raw_data.get("entries", []):
-            for dataset_name, dataset_entries in entry.items():
-                if "sar-presence" in dataset_name.lower():
-                    if dataset_entries:
-                        for vessel_data in dataset_entries:
-                            total_vessels += 1
-                            
-                            # Check if vessel has MMSI (matched)
-                            has_mmsi = bool(vessel_data.get("mmsi"))
-                            if has_mmsi:
-                                vessels_with_mmsi += 1
-                                matched_vessels += 1
-                            
-                            # Extract vessel metadata
-                            vessel = {
-                                "vessel_id": vessel_data.get("vessel_id", ""),
-                                "mmsi": vessel_data.get("mmsi", ""),
-                                "ship_name": vessel_data.get("shipName", ""),
-                                "flag": vessel_data.get("flag", ""),
-                                "vessel_type": vessel_data.get("vessel_type", ""),
-                                "lat": vessel_data.get("lat", 0),
-                                "lon": vessel_data.get("lon", 0),
-                                "detections": vessel_data.get("detections", 0),
-                                "date": vessel_data.get("date", ""),
-                                "matched": has_mmsi,
-                                "raw_data": vessel_data
-                            }
-                            vessels.append(vessel)
+        print("✅ Raw response saved to raw_response_global.json.gz")
         
         # Save processed vessel data
-        with open('vessels_global.json', 'w') as f:
-            json.dump(vessels, f, indent=2)
+        with open('vessels_global.json', 'wb') as f:
+            f.write(orjson.dumps(vessels, option=orjson.OPT_INDENT_2))
         print("✅ Processed vessel data saved to vessels_global.json")
         
         # Print summary
@@ -112,8 +151,8 @@ try:
         print("="*60)
         print(f"Total vessels found: {total_vessels}")
         print(f"Vessels with MMSI: {vessels_with_mmsi}")
-        print(f"Matched vessels: {matched_vessels}")
-        print(f"Unmatched vessels: {total_vessels - matched_vessels}")
+        print(f"Matched vessels: {vessels_with_mmsi}")
+        print(f"Unmatched vessels: {total_vessels - vessels_with_mmsi}")
         print("="*60)
         
         # Show sample coordinates to verify global coverage
@@ -123,9 +162,7 @@ try:
                 hemisphere = "East" if vessel['lon'] >= 0 else "West"
                 print(f"  {i+1}. Lat: {vessel['lat']}, Lon: {vessel['lon']} ({hemisphere}) - {vessel['ship_name'] or 'Unknown'}")
         
-        # Check longitude distribution
-        west_count = len([v for v in vessels if v['lon'] < 0])
-        east_count = len([v for v in vessels if v['lon'] >= 0])
+        # Longitude distribution (counted while processing entries)
         print(f"\n🌍 Hemisphere Distribution:")
         print(f"  Western Hemisphere: {west_count} vessels")
         print(f"  Eastern Hemisphere: {east_count} vessels")
@@ -136,3 +173,5 @@ try:
         
 except Exception as e:
     print(f"❌ Error: {e}")
+finally:
+    session.close()